@@ -1,11 +1,12 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 from contextlib import asynccontextmanager
 
-from app.utils.config import Settings
-from app.utils.posthog_client import shutdown_posthog
+from app.utils.config import get_settings
+from app.utils.db_utils import close_db_pool
+from app.utils.posthog_client import close_llm_http_client, shutdown_posthog
 from app.routers import (
     chat,
     embedding,
@@ -16,7 +17,7 @@ from app.routers import (
 import logging
 
 # Load configuration
-settings = Settings()
+settings = get_settings()
 
 # Configure logging
 logging.basicConfig(
@@ -29,27 +30,45 @@ logging.basicConfig(
 async def lifespan(app: FastAPI):
     """Lifespan event handler for startup and shutdown."""
     # Startup
-    logging.info(f"🚀 MiniClue AI Service starting on {settings.host}:{settings.port}")
-    logging.info(f"Environment: {settings.app_env}")
+    logging.info(
+        "🚀 MiniClue AI Service starting on %s:%s", settings.host, settings.port
+    )
+    logging.info("Environment: %s", settings.app_env)
     logging.info("Routers registered: /ingestion, /embedding, /image-analysis, /chat")
     yield
     # Shutdown
+    await close_db_pool()
+    await close_llm_http_client()
     shutdown_posthog()
 
 
-app = FastAPI(title="MiniClue AI Service", lifespan=lifespan)
+app = FastAPI(
+    title="MiniClue AI Service",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+
+
+class RequestLoggingMiddleware:
+    """Pure ASGI middleware to log requests that fail with an unhandled exception."""
 
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log all incoming requests."""
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next):
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send)
         except Exception as e:
             logging.error(
-                f"Request failed: {request.method} {request.url.path} - {type(e).__name__}: {e}"
+                "Request failed: %s %s - %s: %s",
+                scope["method"],
+                scope["path"],
+                type(e).__name__,
+                e,
             )
             raise
 
@@ -67,23 +86,25 @@ async def health():
 @app.get("/debug/config", tags=["debug"])
 async def debug_config():
     """Returns the current application configuration for debugging."""
-    fresh = Settings()
-    return fresh.model_dump()
+    return get_settings().model_dump()
 
 
 # Exception handlers
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
-    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+    return ORJSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
 
 
 @app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception):
     logging.error(
-        f"Unhandled exception for {request.method} {request.url.path}: {type(exc).__name__}",
+        "Unhandled exception for %s %s: %s",
+        request.method,
+        request.url.path,
+        type(exc).__name__,
         exc_info=exc,
     )
-    return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
+    return ORJSONResponse(status_code=500, content={"detail": "Internal Server Error"})
 
 
 # Include routers for Pub/Sub push subscriptions
@@ -45,8 +45,10 @@ async def handle_chat(request: ChatRequest):
                 yield f"data: {final_chunk.model_dump_json()}\n\n"
             except asyncio.CancelledError:
                 logging.warning(
-                    f"Chat stream cancelled: lecture_id={request.lecture_id}, "
-                    f"chat_id={request.chat_id}, user_id={request.user_id}"
+                    "Chat stream cancelled: lecture_id=%s, chat_id=%s, user_id=%s",
+                    request.lecture_id,
+                    request.chat_id,
+                    request.user_id,
                 )
                 # Send error chunk before raising
                 error_chunk = ChatStreamChunk(content="", done=True)
@@ -57,9 +59,13 @@ async def handle_chat(request: ChatRequest):
                 raise
             except InvalidAPIKeyError as e:
                 logging.error(
-                    f"Invalid API key for chat: lecture_id={request.lecture_id}, "
-                    f"chat_id={request.chat_id}, user_id={request.user_id}, "
-                    f"model={request.model}, error={e}"
+                    "Invalid API key for chat: lecture_id=%s, chat_id=%s, "
+                    "user_id=%s, model=%s, error=%s",
+                    request.lecture_id,
+                    request.chat_id,
+                    request.user_id,
+                    request.model,
+                    e,
                 )
                 error_chunk = ChatStreamChunk(
                     content="Error: Invalid API key", done=True
@@ -67,17 +73,25 @@ async def handle_chat(request: ChatRequest):
                 yield f"data: {error_chunk.model_dump_json()}\n\n"
             except ValueError as e:
                 logging.error(
-                    f"Validation error for chat: lecture_id={request.lecture_id}, "
-                    f"chat_id={request.chat_id}, user_id={request.user_id}, "
-                    f"model={request.model}, error={e}"
+                    "Validation error for chat: lecture_id=%s, chat_id=%s, "
+                    "user_id=%s, model=%s, error=%s",
+                    request.lecture_id,
+                    request.chat_id,
+                    request.user_id,
+                    request.model,
+                    e,
                 )
                 error_chunk = ChatStreamChunk(content=f"Error: {str(e)}", done=True)
                 yield f"data: {error_chunk.model_dump_json()}\n\n"
             except Exception as e:
                 logging.error(
-                    f"Chat request failed: lecture_id={request.lecture_id}, "
-                    f"chat_id={request.chat_id}, user_id={request.user_id}, "
-                    f"model={request.model}, error={e}",
+                    "Chat request failed: lecture_id=%s, chat_id=%s, "
+                    "user_id=%s, model=%s, error=%s",
+                    request.lecture_id,
+                    request.chat_id,
+                    request.user_id,
+                    request.model,
+                    e,
                     exc_info=True,
                 )
                 error_chunk = ChatStreamChunk(
@@ -96,9 +110,13 @@ async def handle_chat(request: ChatRequest):
 
     except Exception as e:
         logging.error(
-            f"Failed to create chat stream: lecture_id={request.lecture_id}, "
-            f"chat_id={request.chat_id}, user_id={request.user_id}, "
-            f"model={request.model}, error={e}",
+            "Failed to create chat stream: lecture_id=%s, chat_id=%s, "
+            "user_id=%s, model=%s, error=%s",
+            request.lecture_id,
+            request.chat_id,
+            request.user_id,
+            request.model,
+            e,
             exc_info=True,
         )
         raise HTTPException(
@@ -121,8 +139,12 @@ async def handle_generate_title(request: ChatTitleRequest):
         return ChatTitleResponse(title=title)
     except InvalidAPIKeyError as e:
         logging.error(
-            f"Invalid API key for title generation: lecture_id={request.lecture_id}, "
-            f"chat_id={request.chat_id}, user_id={request.user_id}, error={e}"
+            "Invalid API key for title generation: lecture_id=%s, chat_id=%s, "
+            "user_id=%s, error=%s",
+            request.lecture_id,
+            request.chat_id,
+            request.user_id,
+            e,
         )
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -130,8 +152,12 @@ async def handle_generate_title(request: ChatTitleRequest):
         )
     except ValueError as e:
         logging.error(
-            f"Validation error for title generation: lecture_id={request.lecture_id}, "
-            f"chat_id={request.chat_id}, user_id={request.user_id}, error={e}"
+            "Validation error for title generation: lecture_id=%s, chat_id=%s, "
+            "user_id=%s, error=%s",
+            request.lecture_id,
+            request.chat_id,
+            request.user_id,
+            e,
         )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -139,8 +165,12 @@ async def handle_generate_title(request: ChatTitleRequest):
         )
     except Exception as e:
         logging.error(
-            f"Title generation failed: lecture_id={request.lecture_id}, "
-            f"chat_id={request.chat_id}, user_id={request.user_id}, error={e}",
+            "Title generation failed: lecture_id=%s, chat_id=%s, "
+            "user_id=%s, error=%s",
+            request.lecture_id,
+            request.chat_id,
+            request.user_id,
+            e,
             exc_info=True,
         )
         raise HTTPException(
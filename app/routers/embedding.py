@@ -1,8 +1,9 @@
 import logging
 
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Request, status, Depends
+from pydantic import ValidationError
 
-from app.schemas.common import PubSubRequest
+from app.schemas.common import PUBSUB_REQUEST_OPENAPI, PubSubRequest
 from app.schemas.embedding import EmbeddingPayload
 from app.services.embedding.orchestrator import process_embedding_job
 from app.utils.auth import verify_token
@@ -16,18 +17,28 @@ router = APIRouter(
 )
 
 
-@router.post("", status_code=status.HTTP_204_NO_CONTENT)
-async def handle_embedding_job(request: PubSubRequest):
+@router.post(
+    "", status_code=status.HTTP_204_NO_CONTENT, openapi_extra=PUBSUB_REQUEST_OPENAPI
+)
+async def handle_embedding_job(request: Request):
     """Handles an embedding job request from Pub/Sub."""
     try:
-        payload = EmbeddingPayload(**request.message.data)
+        envelope = PubSubRequest.model_validate_json(await request.body())
+        payload = EmbeddingPayload.model_validate_json(envelope.message.data)
+    except ValidationError as e:
+        # Permanent error: a malformed message can never succeed, so acknowledge
+        # it instead of letting Pub/Sub redeliver it
+        logging.error("Malformed embedding job message: %s", e)
+        return  # Return 204 to acknowledge the message
+
+    try:
         await process_embedding_job(payload)
     except InvalidAPIKeyError as e:
         # Permanent error: acknowledge message to stop Pub/Sub retries
-        logging.error(f"Invalid API key for embedding job: {e}")
+        logging.error("Invalid API key for embedding job: %s", e)
         return  # Return 204 to acknowledge the message
     except Exception as e:
-        logging.error(f"Embedding job failed: {e}", exc_info=True)
+        logging.error("Embedding job failed: %s", e, exc_info=True)
         # Re-raise as an HTTPException to signal a server-side error to Pub/Sub,
         # which will trigger a retry. The dead-letter queue is the final backstop.
         raise HTTPException(
@@ -1,8 +1,9 @@
 import logging
 
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Request, status, Depends
+from pydantic import ValidationError
 
-from app.schemas.common import PubSubRequest
+from app.schemas.common import PUBSUB_REQUEST_OPENAPI, PubSubRequest
 from app.schemas.image_analysis import ImageAnalysisPayload
 from app.services.image_analysis.orchestrator import process_image_analysis_job
 from app.utils.auth import verify_token
@@ -16,18 +17,28 @@ router = APIRouter(
 )
 
 
-@router.post("", status_code=status.HTTP_204_NO_CONTENT)
-async def handle_image_analysis_job(request: PubSubRequest):
+@router.post(
+    "", status_code=status.HTTP_204_NO_CONTENT, openapi_extra=PUBSUB_REQUEST_OPENAPI
+)
+async def handle_image_analysis_job(request: Request):
     """Handles an image analysis job request from Pub/Sub."""
     try:
-        payload = ImageAnalysisPayload(**request.message.data)
+        envelope = PubSubRequest.model_validate_json(await request.body())
+        payload = ImageAnalysisPayload.model_validate_json(envelope.message.data)
+    except ValidationError as e:
+        # Permanent error: a malformed message can never succeed, so acknowledge
+        # it instead of letting Pub/Sub redeliver it
+        logging.error("Malformed image analysis job message: %s", e)
+        return  # Return 204 to acknowledge the message
+
+    try:
         await process_image_analysis_job(payload)
     except InvalidAPIKeyError as e:
         # Permanent error: acknowledge message to stop Pub/Sub retries
-        logging.error(f"Invalid API key for image analysis job: {e}")
+        logging.error("Invalid API key for image analysis job: %s", e)
         return  # Return 204 to acknowledge the message
     except Exception as e:
-        logging.error(f"Image analysis job failed: {e}", exc_info=True)
+        logging.error("Image analysis job failed: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to process image analysis job: {e}",
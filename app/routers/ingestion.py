@@ -1,8 +1,9 @@
 import logging
 
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Request, status, Depends
+from pydantic import ValidationError
 
-from app.schemas.common import PubSubRequest
+from app.schemas.common import PUBSUB_REQUEST_OPENAPI, PubSubRequest
 from app.schemas.ingestion import IngestionPayload
 from app.services.ingestion.orchestrator import ingest
 from app.utils.auth import verify_token
@@ -14,14 +15,24 @@ router = APIRouter(
 )
 
 
-@router.post("", status_code=status.HTTP_204_NO_CONTENT)
-async def handle_ingestion_job(request: PubSubRequest):
+@router.post(
+    "", status_code=status.HTTP_204_NO_CONTENT, openapi_extra=PUBSUB_REQUEST_OPENAPI
+)
+async def handle_ingestion_job(request: Request):
     """Handles an ingestion job request from Pub/Sub."""
     try:
-        payload = IngestionPayload(**request.message.data)
+        envelope = PubSubRequest.model_validate_json(await request.body())
+        payload = IngestionPayload.model_validate_json(envelope.message.data)
+    except ValidationError as e:
+        # Permanent error: a malformed message can never succeed, so acknowledge
+        # it instead of letting Pub/Sub redeliver it
+        logging.error("Malformed ingestion job message: %s", e)
+        return  # Return 204 to acknowledge the message
+
+    try:
         await ingest(payload)
     except Exception as e:
-        logging.error(f"Ingestion job failed: {e}", exc_info=True)
+        logging.error("Ingestion job failed: %s", e, exc_info=True)
         # Re-raise to be caught by the global exception handler
         # This ensures the message is not acknowledged and will be redelivered.
         raise HTTPException(
@@ -1,12 +1,12 @@
 import uvicorn
 from dotenv import load_dotenv
 
-from app.utils.config import Settings
+from app.utils.config import get_settings
 
 # Load environment variables from .env, overriding any existing ones
 load_dotenv(override=True)
 
-settings = Settings()
+settings = get_settings()
 
 
 # Start the server
@@ -4,19 +4,51 @@ from pydantic import BaseModel, Field, field_validator
 
 
 class PubSubMessage(BaseModel):
-    data: dict = Field(..., alias="data")
+    data: bytes = Field(..., alias="data")
 
     @field_validator("data", mode="before")
     @classmethod
-    def decode_and_parse_data(cls, v):
-        """Decodes base64 and parses the inner JSON."""
+    def decode_data(cls, v):
+        """Decodes base64 into the raw JSON bytes of the inner payload."""
         if isinstance(v, str):
-            decoded_bytes = base64.b64decode(v)
-            decoded_str = decoded_bytes.decode("utf-8")
-            return json.loads(decoded_str)
+            return base64.b64decode(v)
+        if isinstance(v, dict):
+            return json.dumps(v).encode("utf-8")
         return v
 
 
 class PubSubRequest(BaseModel):
     message: PubSubMessage = Field(..., alias="message")
     subscription: str = Field(..., alias="subscription")
+
+
+def _inline_schema_refs(node, defs: dict):
+    """Replaces local $ref entries with the definitions they point to."""
+    if isinstance(node, dict):
+        ref = node.get("$ref")
+        if ref is not None:
+            return _inline_schema_refs(defs[ref.rsplit("/", 1)[-1]], defs)
+        return {key: _inline_schema_refs(value, defs) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_inline_schema_refs(item, defs) for item in node]
+    return node
+
+
+def _pubsub_request_openapi() -> dict:
+    """
+    OpenAPI request body for Pub/Sub push endpoints. They parse the raw body
+    themselves, so FastAPI cannot derive the schema from a typed parameter.
+    """
+    schema = PubSubRequest.model_json_schema()
+    defs = schema.pop("$defs", {})
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": _inline_schema_refs(schema, defs)}
+            },
+        }
+    }
+
+
+PUBSUB_REQUEST_OPENAPI = _pubsub_request_openapi()
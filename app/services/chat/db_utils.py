@@ -1,83 +1,58 @@
 import logging
-import json
 from uuid import UUID
 from typing import List, Dict, Any
 
 import asyncpg
+import orjson
 
 
-async def query_similar_embeddings(
+async def query_relevant_chunks(
     conn: asyncpg.Connection,
     lecture_id: UUID,
-    query_embedding: List[float],
+    query_vector: str,
     limit: int = 5,
 ) -> List[asyncpg.Record]:
     """
-    Query similar embeddings using cosine similarity.
-    Uses 1 - (vector <=> $1::vector) for cosine similarity.
+    Retrieve the top matching chunks for a query in a single round trip.
+    Ranks embeddings by cosine distance, then joins the full chunk text along with
+    OCR and alt text from associated content images.
+    `query_vector` is the pgvector text literal produced by the embedding utils.
     """
-    # Convert list to string format for pgvector (same format as used in embedding service)
-    query_vector_str = "[" + ",".join(map(str, query_embedding)) + "]"
-
-    return await conn.fetch(
-        """
-        SELECT 
-            e.chunk_id,
-            e.slide_id,
-            e.lecture_id,
-            e.slide_number,
-            c.text,
-            c.chunk_index,
-            1 - (e.vector <=> $1::vector) AS similarity
-        FROM embeddings e
-        JOIN chunks c ON e.chunk_id = c.id
-        WHERE e.lecture_id = $2
-        ORDER BY e.vector <=> $1::vector
-        LIMIT $3
-        """,
-        query_vector_str,
-        lecture_id,
-        limit,
-    )
-
-
-async def get_chunk_context(
-    conn: asyncpg.Connection, chunk_ids: List[UUID]
-) -> List[asyncpg.Record]:
-    """
-    Retrieve full text and metadata for matched chunks.
-    Also includes OCR and alt text from associated content images.
-    """
-    if not chunk_ids:
-        return []
-
-    chunk_ids_str = [str(cid) for cid in chunk_ids]
-
-    # Get chunks with their slide images' OCR and alt text
     return await conn.fetch(
         """
-        SELECT DISTINCT
+        WITH topk AS (
+            SELECT
+                e.chunk_id,
+                1 - (e.vector <=> $1::vector) AS similarity
+            FROM embeddings e
+            WHERE e.lecture_id = $2
+            ORDER BY e.vector <=> $1::vector
+            LIMIT $3
+        )
+        SELECT
             c.id,
             c.slide_id,
             c.lecture_id,
             c.slide_number,
             c.chunk_index,
             c.text,
-            COALESCE(
-                STRING_AGG(DISTINCT si.ocr_text, ' ' ORDER BY si.ocr_text) FILTER (WHERE si.ocr_text IS NOT NULL),
-                ''
-            ) AS ocr_text,
-            COALESCE(
-                STRING_AGG(DISTINCT si.alt_text, ' ' ORDER BY si.alt_text) FILTER (WHERE si.alt_text IS NOT NULL),
-                ''
-            ) AS alt_text
-        FROM chunks c
-        LEFT JOIN slide_images si ON si.slide_id = c.slide_id AND si.type = 'content'
-        WHERE c.id = ANY($1::uuid[])
-        GROUP BY c.id, c.slide_id, c.lecture_id, c.slide_number, c.chunk_index, c.text
+            topk.similarity,
+            COALESCE(agg.ocr_text, '') AS ocr_text,
+            COALESCE(agg.alt_text, '') AS alt_text
+        FROM topk
+        JOIN chunks c ON c.id = topk.chunk_id
+        LEFT JOIN LATERAL (
+            SELECT
+                STRING_AGG(DISTINCT si.ocr_text, ' ' ORDER BY si.ocr_text) AS ocr_text,
+                STRING_AGG(DISTINCT si.alt_text, ' ' ORDER BY si.alt_text) AS alt_text
+            FROM slide_images si
+            WHERE si.slide_id = c.slide_id AND si.type = 'content'
+        ) agg ON TRUE
         ORDER BY c.slide_number, c.chunk_index
         """,
-        chunk_ids_str,
+        query_vector,
+        lecture_id,
+        limit,
     )
 
 
@@ -140,8 +115,8 @@ async def get_message_history(
         # Parse JSONB field - asyncpg returns JSONB as string or already parsed dict/list
         if isinstance(parts_raw, str):
             try:
-                parts = json.loads(parts_raw)
-            except json.JSONDecodeError as e:
+                parts = orjson.loads(parts_raw)
+            except orjson.JSONDecodeError as e:
                 logging.warning(
                     f"[get_message_history] Failed to parse parts JSON for row {idx + 1}: {e}, parts={parts_raw}"
                 )
@@ -1,16 +1,18 @@
 import asyncio
 import logging
+import time
+from operator import itemgetter
 from typing import AsyncGenerator, List, Dict, Any, TYPE_CHECKING
 
-from app.utils.config import Settings
+from app.utils.config import get_settings
 from app.utils.secret_manager import InvalidAPIKeyError
 from app.utils.llm_utils import (
     extract_text_from_response,
     extract_metadata,
     is_authentication_error,
 )
-from app.utils.model_provider_mapping import get_provider_for_model
-from app.utils.s3_utils import get_s3_client, download_image_as_base64
+from app.utils.model_provider_mapping import Provider, get_provider_for_model
+from app.utils.s3_utils import get_s3_client, download_image_as_data_url
 from app.utils.posthog_client import get_posthog_kwargs
 
 if TYPE_CHECKING:
@@ -21,10 +23,56 @@ if TYPE_CHECKING:
 TITLE_MAX_LENGTH = 80
 TITLE_MAX_TOKENS = 50
 TITLE_TEMPERATURE = 0.7
+TITLE_TIMEOUT_SECONDS = 15.0
 ASSISTANT_MESSAGE_PREVIEW_LENGTH = 200
+S3_DOWNLOAD_CONCURRENCY = 10
+# Stream deltas are coalesced until either threshold is reached; buffered
+# text is flushed once the interval passes even if no new delta arrives
+STREAM_FLUSH_CHARS = 64
+STREAM_FLUSH_INTERVAL_SECONDS = 0.005
+
+# Fields read from each RAG chunk when rendering the lecture context
+_CHUNK_FIELDS = itemgetter("slide_number", "chunk_index", "text")
+
+CHAT_SYSTEM_PROMPT = """You are an expert AI University Tutor specializing in breaking down complex technical concepts into clear, digestible insights.
+
+### YOUR GOAL
+Explain the user's query based on the provided Lecture Slides. Your explanations must be simple, concise and effective.
+
+### RESPONSE GUIDELINES
+1.  **Top-Down Teaching:** Always start with a high-level summary of the "What" and "Why" before diving into the technical "How."
+2.  **Adaptive Explanations (Use tools only when they add value):**
+    - **Analogies:** Use them *only* if the concept is abstract or complex. If used, keep them brief and relevant.
+    - **Visuals (Mermaid.js):** Use *only* if explaining a process, data flow, or logical hierarchy.
+    - **Tables:** Use *only* for comparisons or distinct code breakdowns.
+    - **Concrete Examples:** Mandatory for math, algorithms, or code logic.
+3.  **Natural Flow:** Do not use generic headers like "The Analogy" or "The Big Picture" unless necessary. Use descriptive headers that match the content (e.g., "Analogy: The Hotel System").
+4.  **Tone:** Smart 15-year-old. Concise and direct.
+
+### RULES
+- **Context is King:** Base your answer strictly on the `<lecture_context>`. Use general knowledge only to fill gaps or provide analogies.
+- **Format for Scannability:** Always use Markdown. Structure your response with clear **Headings**, **Numbered Lists**, **Bullet Points**, and **Tables**. Avoid long paragraphs.
+- **Be Concise:** Get straight to the point.
+- **Latex:** Use LaTeX for all math formulas."""
+
+CHAT_SYSTEM_MESSAGE = {"role": "system", "content": CHAT_SYSTEM_PROMPT}
+
+# Wraps the rendered RAG chunks; only {context_text} varies per request
+CHAT_CONTEXT_TEMPLATE = """I am looking at the following lecture content. Use this as your primary source of truth:
+
+    <lecture_context>
+    {context_text}
+    </lecture_context>
+
+    Based on the context above (and any images provided), please answer my upcoming question."""
+
+# Text sent with each referenced slide image; only {slide_number} varies
+SLIDE_IMAGE_CONTEXT_TEMPLATE = "Context: This is the visual slide (Slide {slide_number}) corresponding to the text provided earlier. Analyze the diagrams/code structure visually."
+
+TITLE_SYSTEM_PROMPT = f"""Generate a concise title (maximum {TITLE_MAX_LENGTH} characters) that summarizes the conversation between the user's question and the assistant's response. The title should capture the main topic or question being discussed. Be clear and descriptive. Do not include quotes, colons, or special formatting. Return only the title text."""
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 
 def _create_chat_posthog_properties(
@@ -79,50 +127,26 @@ async def stream_chat_response(
         message_history: Optional list of previous messages (last 5 turns)
     """
 
-    SYSTEM_PROMPT = """You are an expert AI University Tutor specializing in breaking down complex technical concepts into clear, digestible insights.
-
-### YOUR GOAL
-Explain the user's query based on the provided Lecture Slides. Your explanations must be simple, concise and effective.
-
-### RESPONSE GUIDELINES
-1.  **Top-Down Teaching:** Always start with a high-level summary of the "What" and "Why" before diving into the technical "How."
-2.  **Adaptive Explanations (Use tools only when they add value):**
-    - **Analogies:** Use them *only* if the concept is abstract or complex. If used, keep them brief and relevant.
-    - **Visuals (Mermaid.js):** Use *only* if explaining a process, data flow, or logical hierarchy.
-    - **Tables:** Use *only* for comparisons or distinct code breakdowns.
-    - **Concrete Examples:** Mandatory for math, algorithms, or code logic.
-3.  **Natural Flow:** Do not use generic headers like "The Analogy" or "The Big Picture" unless necessary. Use descriptive headers that match the content (e.g., "Analogy: The Hotel System").
-4.  **Tone:** Smart 15-year-old. Concise and direct.
-
-### RULES
-- **Context is King:** Base your answer strictly on the `<lecture_context>`. Use general knowledge only to fill gaps or provide analogies.
-- **Format for Scannability:** Always use Markdown. Structure your response with clear **Headings**, **Numbered Lists**, **Bullet Points**, and **Tables**. Avoid long paragraphs.
-- **Be Concise:** Get straight to the point.
-- **Latex:** Use LaTeX for all math formulas."""
-
-    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    messages = [CHAT_SYSTEM_MESSAGE]
 
     # Build context from RAG chunks
     # 1. Formatting context chunks with XML tags for better boundary detection
-    context_text = ""
-    for chunk in context_chunks:
-        context_text += f"""
-    <slide id="{chunk['slide_number']}" chunk="{chunk['chunk_index']}">
-    {chunk['text']}
+    context_text = "".join(
+        [
+            f"""
+    <slide id="{slide_number}" chunk="{chunk_index}">
+    {text}
     </slide>
     """
+            for slide_number, chunk_index, text in map(_CHUNK_FIELDS, context_chunks)
+        ]
+    )
 
     # 2. Add the user message with explicit instruction on how to treat the context
     messages.append(
         {
             "role": "user",
-            "content": f"""I am looking at the following lecture content. Use this as your primary source of truth:
-
-    <lecture_context>
-    {context_text}
-    </lecture_context>
-
-    Based on the context above (and any images provided), please answer my upcoming question.""",
+            "content": CHAT_CONTEXT_TEMPLATE.format(context_text=context_text),
         }
     )
 
@@ -134,38 +158,51 @@ Explain the user's query based on the provided Lecture Slides. Your explanations
             messages.append({"role": msg["role"], "content": msg["text"]})
 
     # 1. Add resolved references (images) as separate messages
-    if resolved_references:
+    image_refs = [
+        (ref["id"], res["storage_path"])
+        for ref in resolved_references or []
+        if ref["type"] == "slide"
+        for res in ref["resources"]
+        if res.get("storage_path")
+    ]
+    if image_refs:
         s3_client = get_s3_client()
-        try:
-            for ref in resolved_references:
-                if ref["type"] == "slide":
-                    slide_num = ref["id"]
-                    for res in ref["resources"]:
-                        # Add image if path is available
-                        if res.get("storage_path"):
-                            img_base64 = download_image_as_base64(
-                                s3_client, settings.s3_bucket_name, res["storage_path"]
-                            )
-                            if img_base64:
-                                messages.append(
-                                    {
-                                        "role": "user",
-                                        "content": [
-                                            {
-                                                "type": "image_url",
-                                                "image_url": {
-                                                    "url": f"data:image/png;base64,{img_base64}"
-                                                },
-                                            },
-                                            {
-                                                "type": "text",
-                                                "text": f"Context: This is the visual slide (Slide {slide_num}) corresponding to the text provided earlier. Analyze the diagrams/code structure visually.",
-                                            },
-                                        ],
-                                    }
-                                )
-        finally:
-            s3_client.close()
+        semaphore = asyncio.Semaphore(S3_DOWNLOAD_CONCURRENCY)
+
+        async def _download(storage_path: str) -> str | None:
+            async with semaphore:
+                return await asyncio.to_thread(
+                    download_image_as_data_url,
+                    s3_client,
+                    settings.s3_bucket_name,
+                    storage_path,
+                )
+
+        # Each distinct object is downloaded once, however often it is referenced
+        unique_paths = list(dict.fromkeys(path for _, path in image_refs))
+        images = await asyncio.gather(*(_download(path) for path in unique_paths))
+        data_urls = dict(zip(unique_paths, images))
+
+        for slide_num, storage_path in image_refs:
+            data_url = data_urls[storage_path]
+            if data_url:
+                messages.append(
+                    {
+                        "role": "user",
+                        "content": [
+                            {
+                                "type": "image_url",
+                                "image_url": {"url": data_url},
+                            },
+                            {
+                                "type": "text",
+                                "text": SLIDE_IMAGE_CONTEXT_TEMPLATE.format(
+                                    slide_number=slide_num
+                                ),
+                            },
+                        ],
+                    }
+                )
 
     # 2. Add the user query text as the final message
     messages.append({"role": "user", "content": query})
@@ -173,29 +210,92 @@ Explain the user's query based on the provided Lecture Slides. Your explanations
     posthog_properties = _create_chat_posthog_properties(
         lecture_id, chat_id, len(context_chunks)
     )
+    provider = get_provider_for_model(model)
+
+    # Route requests for the same lecture to the same OpenAI prompt cache, since
+    # they share the system prompt and often the same retrieved chunks
+    cache_kwargs = (
+        {"prompt_cache_key": lecture_id} if provider is Provider.OPENAI else {}
+    )
 
     try:
         stream = await client.chat.completions.create(
             model=model,
             messages=messages,
             stream=True,
+            **cache_kwargs,
             **get_posthog_kwargs(
                 user_id=user_id,
                 trace_id=chat_id,
                 properties={
                     "$ai_span_name": "chat_response",
-                    "$ai_provider": get_provider_for_model(model),
+                    "$ai_provider": provider,
                     **posthog_properties,
                 },
             ),
         )
 
-        async for chunk in stream:
-            # Handle streaming events from chat.completions API
-            if chunk.choices and len(chunk.choices) > 0:
-                delta = chunk.choices[0].delta
-                if hasattr(delta, "content") and delta.content:
-                    yield delta.content
+        buffer: List[str] = []
+        buffered_chars = 0
+        # Start in the past so the first delta is sent without delay
+        last_flush = float("-inf")
+        chunks = aiter(stream)
+        # While text is buffered, the next read runs in a task so the text can
+        # be flushed when it does not arrive within the window; otherwise
+        # chunks are read directly
+        next_chunk: asyncio.Future | None = None
+        try:
+            while True:
+                if buffer:
+                    if next_chunk is None:
+                        next_chunk = asyncio.ensure_future(anext(chunks))
+                    timeout = last_flush + STREAM_FLUSH_INTERVAL_SECONDS
+                    done, _ = await asyncio.wait(
+                        {next_chunk}, timeout=max(0.0, timeout - time.monotonic())
+                    )
+                    if not done:
+                        yield "".join(buffer)
+                        buffer.clear()
+                        buffered_chars = 0
+                        last_flush = time.monotonic()
+                        continue
+
+                try:
+                    if next_chunk is not None:
+                        chunk = await next_chunk
+                        next_chunk = None
+                    else:
+                        chunk = await anext(chunks)
+                except StopAsyncIteration:
+                    break
+
+                # Handle streaming events from chat.completions API
+                if chunk.choices and len(chunk.choices) > 0:
+                    delta = chunk.choices[0].delta
+                    if hasattr(delta, "content") and delta.content:
+                        buffer.append(delta.content)
+                        buffered_chars += len(delta.content)
+                        now = time.monotonic()
+                        if (
+                            buffered_chars >= STREAM_FLUSH_CHARS
+                            or now - last_flush >= STREAM_FLUSH_INTERVAL_SECONDS
+                        ):
+                            yield "".join(buffer)
+                            buffer.clear()
+                            buffered_chars = 0
+                            last_flush = now
+        except Exception:
+            # Forward text already received before the error surfaces
+            if buffer:
+                yield "".join(buffer)
+                buffer.clear()
+            raise
+        finally:
+            if next_chunk is not None:
+                next_chunk.cancel()
+
+        if buffer:
+            yield "".join(buffer)
 
     except asyncio.CancelledError:
         logging.warning(
@@ -243,13 +343,14 @@ async def generate_chat_title(
         Tuple of (title, usage_metadata)
     """
 
-    SYSTEM_PROMPT = f"""Generate a concise title (maximum {TITLE_MAX_LENGTH} characters) that summarizes the conversation between the user's question and the assistant's response. The title should capture the main topic or question being discussed. Be clear and descriptive. Do not include quotes, colons, or special formatting. Return only the title text."""
+    # Only a preview of the assistant response is needed for the title
+    assistant_message = assistant_message[:ASSISTANT_MESSAGE_PREVIEW_LENGTH]
 
     # Combine user question and assistant response for context
-    conversation_context = f"User: {user_message}\n\nAssistant: {assistant_message[:ASSISTANT_MESSAGE_PREVIEW_LENGTH]}"
+    conversation_context = f"User: {user_message}\n\nAssistant: {assistant_message}"
 
     messages = [
-        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "system", "content": TITLE_SYSTEM_PROMPT},
         {"role": "user", "content": conversation_context},
     ]
 
@@ -261,6 +362,7 @@ async def generate_chat_title(
             messages=messages,
             max_tokens=TITLE_MAX_TOKENS,
             temperature=TITLE_TEMPERATURE,
+            timeout=TITLE_TIMEOUT_SECONDS,
             **get_posthog_kwargs(
                 user_id=user_id,
                 trace_id=chat_id,
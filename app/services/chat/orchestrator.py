@@ -10,12 +10,15 @@ if TYPE_CHECKING:
     from google.genai import Client
 
 from app.services.chat import db_utils, rag_utils, llm_utils, query_rewriter
-from app.utils.config import Settings
+from app.utils.config import get_settings
 from app.utils.llm_utils import get_llm_context
-from app.utils.db_utils import verify_lecture_exists_and_ownership
+from app.utils.db_utils import get_db_pool, verify_lecture_exists_and_ownership
 
 
-settings = Settings()
+settings = get_settings()
+
+# Upper bound on parts in a single chat message
+MAX_MESSAGE_PARTS = 100
 
 
 async def _parse_message_parts(
@@ -25,7 +28,7 @@ async def _parse_message_parts(
     Extracts text and resolves references from message parts.
     Returns (query_text, resolved_references).
     """
-    query_text = ""
+    text_parts = []
     resolved_references = []
     marker_map = {}  # Map of REF_X to [Slide X]
     seen_slide_ids = set()
@@ -33,7 +36,7 @@ async def _parse_message_parts(
     for part in message:
         part_type = part.get("type")
         if part_type == "text" and part.get("text"):
-            query_text += part["text"]
+            text_parts.append(part["text"])
         elif part_type == "data-reference" and part.get("data"):
             data = part["data"]
             ref = data.get("reference")
@@ -75,6 +78,7 @@ async def _parse_message_parts(
                     )
 
     # Replace reference markers in query text with descriptive names
+    query_text = "".join(text_parts)
     for marker, replacement in marker_map.items():
         query_text = query_text.replace(marker, replacement)
 
@@ -89,17 +93,17 @@ async def _get_api_context(
     Returns (chat_client, chat_provider, embedding_client, rewriter_client).
     """
 
-    # 1. Fetch Embedding API client
-    embedding_client, _ = await get_llm_context(
-        user_id, settings.embedding_model, is_embedding=True
+    (embedding_client, _), (rewriter_client, _), (chat_client, _) = (
+        await asyncio.gather(
+            # 1. Fetch Embedding API client
+            get_llm_context(user_id, settings.embedding_model, is_embedding=True),
+            # 2. Fetch Rewriter API client
+            get_llm_context(user_id, settings.query_rewriter_model),
+            # 3. Fetch Provider-specific API client (for streaming)
+            get_llm_context(user_id, model),
+        )
     )
 
-    # 2. Fetch Rewriter API client
-    rewriter_client, _ = await get_llm_context(user_id, settings.query_rewriter_model)
-
-    # 3. Fetch Provider-specific API client (for streaming)
-    chat_client, _ = await get_llm_context(user_id, model)
-
     return chat_client, embedding_client, rewriter_client
 
 
@@ -121,6 +125,23 @@ async def _get_processed_history(
     return message_history
 
 
+async def _get_owned_chat_history(
+    conn: asyncpg.Connection, lecture_id: UUID, chat_id: UUID, user_id: UUID
+) -> list[dict] | None:
+    """
+    Verifies the user owns the lecture, then fetches the processed message history.
+    Returns None if the lecture is missing or not owned by the user.
+    """
+    if not await verify_lecture_exists_and_ownership(conn, lecture_id, user_id):
+        return None
+    return await _get_processed_history(conn, chat_id, user_id)
+
+
+def _normalize_whitespace(text: str) -> str:
+    """Collapses runs of whitespace so formatting-only rewrites compare equal."""
+    return " ".join(text.split())
+
+
 async def process_chat_request(
     lecture_id: UUID,
     chat_id: UUID,
@@ -135,58 +156,90 @@ async def process_chat_request(
     Streams LLM response.
     Returns async generator of text chunks.
     """
-    conn = await asyncpg.connect(settings.postgres_dsn, statement_cache_size=0)
+    # Reject pathological inputs before touching the database
+    if len(message) > MAX_MESSAGE_PARTS:
+        raise ValueError(f"Message must not exceed {MAX_MESSAGE_PARTS} parts")
+
+    pool = await get_db_pool()
     try:
-        # 1. Verify lecture exists and user owns it
-        if not await verify_lecture_exists_and_ownership(conn, lecture_id, user_id):
-            raise ValueError(
-                f"Lecture {lecture_id} not found or user {user_id} does not own it"
-            )
+        # 1. Fetch the API context (clients) from Secret Manager in the
+        # background; no connection is held while waiting on it
+        api_context = asyncio.create_task(_get_api_context(user_id, model))
+        # Retrieve the task's outcome even when it ends up discarded
+        api_context.add_done_callback(lambda task: task.cancelled() or task.exception())
+        try:
+            async with pool.acquire() as conn:
+                # 2. Verify ownership and load message history
+                message_history = await _get_owned_chat_history(
+                    conn, lecture_id, chat_id, user_id
+                )
+                if message_history is None:
+                    raise ValueError(
+                        f"Lecture {lecture_id} not found or user {user_id} does not own it"
+                    )
+
+                # 3. Parse message parts, resolve references and get resources
+                query_text, resolved_references = await _parse_message_parts(
+                    conn, lecture_id, message
+                )
+
+            chat_client, embedding_client, rewriter_client = await api_context
+        finally:
+            api_context.cancel()
 
-        # 2. Parse message parts, resolve references and get resources
-        query_text, resolved_references = await _parse_message_parts(
-            conn, lecture_id, message
-        )
         if not query_text:
             raise ValueError("Message must contain at least one text part")
 
-        # 3. Get API context (clients)
-        (
-            chat_client,
-            embedding_client,
-            rewriter_client,
-        ) = await _get_api_context(user_id, model)
-
-        # 4. Get message history
-        message_history = await _get_processed_history(conn, chat_id, user_id)
-
-        # 5. Rewrite query using available history
-        rewritten_query = query_text
-        if message_history:
-            try:
-                rewritten_query = await query_rewriter.rewrite_query(
-                    current_question=query_text,
-                    message_history=message_history,
-                    client=rewriter_client,
-                    user_id=str(user_id),
-                    lecture_id=str(lecture_id),
-                    chat_id=str(chat_id),
-                )
-            except Exception as e:
-                logging.warning(f"Query rewriting failed, using original query: {e}")
-
-        # 6. Retrieve relevant chunks via RAG using rewritten query
-        context_chunks = await rag_utils.retrieve_relevant_chunks(
-            conn=conn,
-            lecture_id=lecture_id,
-            query_text=rewritten_query,
-            client=embedding_client,
-            user_id=str(user_id),
-            chat_id=str(chat_id),
-            top_k=settings.rag_top_k,
+        # 4. Embed the original query speculatively while it is rewritten
+        speculative_embedding = asyncio.create_task(
+            rag_utils.embed_query(
+                query_text, embedding_client, str(user_id), str(chat_id)
+            )
         )
+        # Retrieve the task's outcome even when it ends up discarded
+        speculative_embedding.add_done_callback(
+            lambda task: task.cancelled() or task.exception()
+        )
+        try:
+            # 5. Rewrite query using available history
+            rewritten_query = query_text
+            if message_history:
+                try:
+                    rewritten_query = await query_rewriter.rewrite_query(
+                        current_question=query_text,
+                        message_history=message_history,
+                        client=rewriter_client,
+                        user_id=str(user_id),
+                        lecture_id=str(lecture_id),
+                        chat_id=str(chat_id),
+                    )
+                except Exception as e:
+                    logging.warning(
+                        f"Query rewriting failed, using original query: {e}"
+                    )
+
+            # 6. Reuse the speculative embedding unless the rewrite changed
+            # more than whitespace
+            if _normalize_whitespace(rewritten_query) == _normalize_whitespace(
+                query_text
+            ):
+                query_vector = await speculative_embedding
+            else:
+                speculative_embedding.cancel()
+                query_vector = await rag_utils.embed_query(
+                    rewritten_query, embedding_client, str(user_id), str(chat_id)
+                )
+        finally:
+            speculative_embedding.cancel()
+
+        # 7. Retrieve relevant chunks via RAG; connections are only held for
+        # database work, never across LLM or Secret Manager calls
+        async with pool.acquire() as conn:
+            context_chunks = await rag_utils.search(
+                conn, lecture_id, query_vector, top_k=settings.rag_top_k
+            )
 
-        # 7. Stream LLM response
+        # 8. Stream LLM response
         async for chunk in llm_utils.stream_chat_response(
             query=query_text,
             context_chunks=context_chunks,
@@ -212,19 +265,17 @@ async def process_chat_request(
             exc_info=True,
         )
         raise
-    finally:
-        await conn.close()
 
 
 def _extract_text_from_message(message: list[dict]) -> str:
     """
     Extracts plain text from message parts.
     """
-    text = ""
-    for part in message:
-        if part.get("type") == "text" and part.get("text"):
-            text += part["text"] + " "
-    return text.strip()
+    return " ".join(
+        part["text"]
+        for part in message
+        if part.get("type") == "text" and part.get("text")
+    ).strip()
 
 
 async def process_title_generation(
@@ -248,10 +299,14 @@ async def process_title_generation(
     Returns:
         Generated title string
     """
-    conn = await asyncpg.connect(settings.postgres_dsn, statement_cache_size=0)
+    pool = await get_db_pool()
     try:
         # 1. Verify lecture exists and user owns it
-        if not await verify_lecture_exists_and_ownership(conn, lecture_id, user_id):
+        async with pool.acquire() as conn:
+            owns_lecture = await verify_lecture_exists_and_ownership(
+                conn, lecture_id, user_id
+            )
+        if not owns_lecture:
             raise ValueError(
                 f"Lecture {lecture_id} not found or user {user_id} does not own it"
             )
@@ -287,5 +342,3 @@ async def process_title_generation(
             exc_info=True,
         )
         raise
-    finally:
-        await conn.close()
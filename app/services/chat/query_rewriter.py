@@ -1,9 +1,9 @@
 import logging
 from typing import List, Dict, Any, TYPE_CHECKING
 
-from app.utils.config import Settings
+from app.utils.config import get_settings
 from app.utils.secret_manager import InvalidAPIKeyError
-from app.utils.llm_utils import extract_text_from_response
+from app.utils.llm_utils import extract_text_from_response, is_authentication_error
 from app.utils.model_provider_mapping import get_provider_for_model
 from app.utils.posthog_client import get_posthog_kwargs
 
@@ -13,16 +13,12 @@ if TYPE_CHECKING:
 # Constants
 HISTORY_TURNS_COUNT = 3
 MESSAGES_PER_TURN = 2
+# The rewrite is on the chat critical path; on timeout the original question is used
+REWRITER_MAX_TOKENS = 200
+REWRITER_TIMEOUT_SECONDS = 10.0
 
 # Initialize settings
-settings = Settings()
-
-
-def _is_authentication_error(error: Exception) -> bool:
-    """Checks if the error is related to authentication/invalid API key."""
-    error_str = str(error).lower()
-    auth_indicators = ["authentication", "unauthorized", "invalid api key", "401"]
-    return any(indicator in error_str for indicator in auth_indicators)
+settings = get_settings()
 
 
 def _create_query_rewriter_posthog_properties(
@@ -106,6 +102,8 @@ Instructions:
         response = await client.chat.completions.create(
             model=settings.query_rewriter_model,
             messages=messages,
+            max_tokens=REWRITER_MAX_TOKENS,
+            timeout=REWRITER_TIMEOUT_SECONDS,
             **get_posthog_kwargs(
                 user_id=user_id,
                 trace_id=chat_id,
@@ -130,7 +128,7 @@ Instructions:
         return rewritten_query
 
     except Exception as e:
-        if _is_authentication_error(e):
+        if is_authentication_error(e):
             logging.error(
                 f"OpenAI authentication error in query rewriter: "
                 f"user_id={user_id}, error={e}"
@@ -3,21 +3,22 @@ from uuid import UUID
 from typing import List, Dict, Any
 
 import asyncpg
+import orjson
 
 from app.services.chat import db_utils
+from app.services.chat.semantic_cache import get_semantic_cache
 from app.utils import embedding_utils
-from app.utils.config import Settings
+from app.utils.config import get_settings
 
-settings = Settings()
+settings = get_settings()
 
 
-def generate_query_embedding(
-    text: str, client: Any, user_id: str, chat_id: str
-) -> List[float]:
+async def embed_query(text: str, client: Any, user_id: str, chat_id: str) -> str:
     """
     Create embedding for user query.
+    Returns the vector as a pgvector text literal, ready to bind as $1::vector.
     """
-    results, _ = embedding_utils.generate_embeddings(
+    results, _ = await embedding_utils.generate_embeddings(
         texts=[text],
         chat_id=chat_id,
         user_id=user_id,
@@ -27,43 +28,36 @@ def generate_query_embedding(
     if not results:
         raise ValueError("Failed to generate query embedding")
 
-    import json
+    return results[0]["vector"]
 
-    vector_str = results[0]["vector"]
-    return json.loads(vector_str)
 
-
-async def retrieve_relevant_chunks(
+async def search(
     conn: asyncpg.Connection,
     lecture_id: UUID,
-    chat_id: str,
-    query_text: str,
-    client: Any,
-    user_id: str,
+    query_vector: str,
     top_k: int = 5,
 ) -> List[Dict[str, Any]]:
     """
-    Full RAG pipeline: generate query embedding and retrieve relevant chunks.
+    Retrieve the chunks most similar to an embedded query.
     Returns list of chunk texts with metadata (slide_number, chunk_index).
     """
-    # Generate query embedding
-    query_embedding = generate_query_embedding(query_text, client, user_id, chat_id)
-
-    # Query similar embeddings
-    similar_embeddings = await db_utils.query_similar_embeddings(
-        conn, lecture_id, query_embedding, limit=top_k
+    # Reuse results of a near-identical earlier query on this lecture
+    if settings.semantic_cache_enabled:
+        cache = get_semantic_cache()
+        embedding = orjson.loads(query_vector)
+        cached = cache.get(lecture_id, embedding)
+        if cached is not None:
+            return cached
+
+    # Retrieve the most similar chunks with their OCR and alt text
+    chunks = await db_utils.query_relevant_chunks(
+        conn, lecture_id, query_vector, limit=top_k
     )
 
-    if not similar_embeddings:
+    if not chunks:
         logging.warning(f"No similar embeddings found for lecture {lecture_id}")
         return []
 
-    # Get chunk IDs
-    chunk_ids = [UUID(str(row["chunk_id"])) for row in similar_embeddings]
-
-    # Get full chunk context with OCR and alt text
-    chunks = await db_utils.get_chunk_context(conn, chunk_ids)
-
     # Build enriched text blocks
     results = []
     for chunk in chunks:
@@ -83,4 +77,7 @@ async def retrieve_relevant_chunks(
             }
         )
 
+    if settings.semantic_cache_enabled:
+        cache.put(lecture_id, embedding, results)
+
     return results
@@ -0,0 +1,188 @@
+import logging
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+
+from app.utils.config import get_settings
+from app.utils.embedding_utils import EMBEDDING_DIMENSIONS
+
+# LSH layout: each table hashes a vector to a NUM_BITS-bit bucket
+NUM_TABLES = 8
+NUM_BITS = 16
+PROJECTION_SEED = 0
+
+
+class _CacheEntry(NamedTuple):
+    lecture_id: UUID
+    vector: np.ndarray
+    chunks: List[Dict[str, Any]]
+    buckets: tuple[int, ...]
+    expires_at: float
+
+
+class SemanticCache:
+    """
+    In-process cache of RAG retrieval results keyed by query embedding.
+
+    Candidate entries are found through random-projection LSH buckets scoped to
+    a lecture, then confirmed with an exact cosine similarity check. Entries are
+    evicted least-recently-used first and expire after a fixed TTL.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        ttl_seconds: float,
+        max_entries: int,
+        dim: int = EMBEDDING_DIMENSIONS,
+        num_tables: int = NUM_TABLES,
+        num_bits: int = NUM_BITS,
+        seed: int = PROJECTION_SEED,
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.num_tables = num_tables
+        self.num_bits = num_bits
+
+        rng = np.random.default_rng(seed)
+        self._projections = rng.standard_normal(
+            (num_tables * num_bits, dim), dtype=np.float32
+        )
+        self._bit_weights = 1 << np.arange(num_bits, dtype=np.int64)
+
+        self._entries: OrderedDict[int, _CacheEntry] = OrderedDict()
+        self._buckets: Dict[tuple[UUID, int, int], set[int]] = {}
+        self._next_id = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def _normalize(self, vector: Sequence[float]) -> Optional[np.ndarray]:
+        """Returns the vector as a unit-length float32 array, or None if it is zero."""
+        arr = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(arr)
+        if not norm:
+            return None
+        return arr / norm
+
+    def _hash(self, unit: np.ndarray) -> tuple[int, ...]:
+        """Computes one bucket id per table from the signs of the projections."""
+        signs = (self._projections @ unit > 0).reshape(self.num_tables, self.num_bits)
+        return tuple((signs @ self._bit_weights).tolist())
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        for table, bucket in enumerate(entry.buckets):
+            key = (entry.lecture_id, table, bucket)
+            ids = self._buckets.get(key)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._buckets[key]
+
+    def get(
+        self, lecture_id: UUID, vector: Sequence[float]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Returns cached chunks for the most similar earlier query on the same
+        lecture, or None if no entry reaches the similarity threshold.
+        """
+        unit = self._normalize(vector)
+        if unit is None:
+            return None
+
+        candidates: set[int] = set()
+        for table, bucket in enumerate(self._hash(unit)):
+            candidates.update(self._buckets.get((lecture_id, table, bucket), ()))
+
+        now = time.monotonic()
+        best_id, best_similarity = None, -1.0
+        for entry_id in candidates:
+            entry = self._entries[entry_id]
+            if entry.expires_at <= now:
+                self._remove(entry_id)
+                continue
+            similarity = float(entry.vector @ unit)
+            if similarity > best_similarity:
+                best_id, best_similarity = entry_id, similarity
+
+        if best_id is None or best_similarity < self.threshold:
+            self.misses += 1
+            logging.debug(
+                "Semantic cache miss for lecture %s (hits=%d, misses=%d)",
+                lecture_id,
+                self.hits,
+                self.misses,
+            )
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(best_id)
+        logging.info(
+            "Semantic cache hit for lecture %s (similarity=%.3f, hits=%d, misses=%d)",
+            lecture_id,
+            best_similarity,
+            self.hits,
+            self.misses,
+        )
+        # Callers get their own list so a hit cannot alter the cached entry
+        return list(self._entries[best_id].chunks)
+
+    def invalidate(self, lecture_id: UUID) -> None:
+        """Drops every cached entry for a lecture."""
+        for entry_id in [
+            entry_id
+            for entry_id, entry in self._entries.items()
+            if entry.lecture_id == lecture_id
+        ]:
+            self._remove(entry_id)
+
+    def put(
+        self,
+        lecture_id: UUID,
+        vector: Sequence[float],
+        chunks: List[Dict[str, Any]],
+    ) -> None:
+        """Stores retrieved chunks for a query embedding."""
+        unit = self._normalize(vector)
+        if unit is None:
+            return
+
+        entry_id = self._next_id
+        self._next_id += 1
+
+        buckets = self._hash(unit)
+        self._entries[entry_id] = _CacheEntry(
+            lecture_id=lecture_id,
+            vector=unit,
+            chunks=list(chunks),
+            buckets=buckets,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        for table, bucket in enumerate(buckets):
+            self._buckets.setdefault((lecture_id, table, bucket), set()).add(entry_id)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> SemanticCache:
+    """Returns the process-wide semantic cache, built on first use."""
+    settings = get_settings()
+    return SemanticCache(
+        threshold=settings.semantic_cache_threshold,
+        ttl_seconds=settings.semantic_cache_ttl_seconds,
+        max_entries=settings.semantic_cache_max_entries,
+    )
+
+
+def invalidate_semantic_cache(lecture_id: UUID) -> None:
+    """Drops this process's cached retrieval results for a lecture whose content changed."""
+    if get_settings().semantic_cache_enabled:
+        get_semantic_cache().invalidate(lecture_id)
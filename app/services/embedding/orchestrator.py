@@ -3,14 +3,15 @@ import json
 
 import asyncpg
 
+from app.services.chat.semantic_cache import invalidate_semantic_cache
 from app.services.embedding import db_utils
 from app.schemas.embedding import EmbeddingPayload
 from app.utils import embedding_utils
 from app.utils import llm_utils
-from app.utils.config import Settings
+from app.utils.config import get_settings
 from app.utils.db_utils import verify_lecture_exists
 
-settings = Settings()
+settings = get_settings()
 
 
 async def process_embedding_job(payload: EmbeddingPayload):
@@ -56,7 +57,7 @@ async def process_embedding_job(payload: EmbeddingPayload):
         )
 
         # 5. Generate embeddings in a batch, capturing metadata
-        embedding_results, metadata = embedding_utils.generate_embeddings(
+        embedding_results, metadata = await embedding_utils.generate_embeddings(
             texts=enriched_texts,
             lecture_id=str(lecture_id),
             user_id=payload.customer_identifier,
@@ -101,6 +102,9 @@ async def process_embedding_job(payload: EmbeddingPayload):
             await db_utils.set_embeddings_complete(conn, lecture_id)
             await db_utils.set_lecture_status_to_complete(conn, lecture_id)
 
+        # Cached retrieval results were computed against the old vectors
+        invalidate_semantic_cache(lecture_id)
+
     except Exception as e:
         logging.error(
             f"Error processing embedding for lecture {lecture_id}: {e}", exc_info=True
@@ -7,7 +7,7 @@ from typing import Optional, TYPE_CHECKING
 from pydantic import ValidationError
 
 from app.schemas.image_analysis import ImageAnalysisResult
-from app.utils.config import Settings
+from app.utils.config import get_settings
 from app.utils.secret_manager import InvalidAPIKeyError
 from app.utils.model_provider_mapping import get_provider_for_model
 from app.utils.llm_utils import (
@@ -25,9 +25,40 @@ if TYPE_CHECKING:
 INITIAL_REQUEST_TIMEOUT = 60.0
 RETRY_REQUEST_TIMEOUT = 30.0
 MAX_RETRIES = 2
+# Generous enough for dense OCR text while capping runaway generations
+IMAGE_ANALYSIS_MAX_TOKENS = 8192
+
+IMAGE_ANALYSIS_SYSTEM_PROMPT = """You are an image analysis API. Your sole function is to analyze the provided image and return a single, raw JSON object.
+
+You MUST strictly adhere to the following JSON structure:
+{
+"type": "content" | "decorative",
+"ocr_text": "string",
+"alt_text": "string"
+}
+
+- "type": Classify the image. Use "content" for meaningful information (diagrams, charts, text). Use "decorative" for aesthetics (backgrounds, stock photos).
+- "ocr_text": Extract all visible text. Return an empty string if there is no text.
+- "alt_text": Write a concise, descriptive alt text for accessibility, explaining the image's content and purpose.
+
+Your response MUST NOT include any explanations, introductory text, or markdown formatting like ```json. It must be ONLY the raw JSON object."""
+
+IMAGE_ANALYSIS_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": IMAGE_ANALYSIS_SYSTEM_PROMPT,
+}
+
+# Text part sent alongside every image; only the image part varies per call
+IMAGE_ANALYSIS_INSTRUCTION_PART = {
+    "type": "text",
+    "text": "Analyze the image per the system prompt.",
+}
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
+
+# Caps concurrent image analysis calls across jobs handled by this process
+_analysis_semaphore = asyncio.Semaphore(settings.image_analysis_max_concurrency)
 
 
 def _create_posthog_properties(
@@ -131,7 +162,6 @@ async def analyze_image(
     Raises:
         ValueError: If the request times out or response validation fails.
         InvalidAPIKeyError: If the API key is invalid.
-        FileNotFoundError: If the prompt file is not found.
     """
 
     from PIL import Image
@@ -147,44 +177,31 @@ async def analyze_image(
     )
 
     messages = [
-        {
-            "role": "system",
-            "content": """You are an image analysis API. Your sole function is to analyze the provided image and return a single, raw JSON object.
-
-You MUST strictly adhere to the following JSON structure:
-{
-"type": "content" | "decorative",
-"ocr_text": "string",
-"alt_text": "string"
-}
-
-- "type": Classify the image. Use "content" for meaningful information (diagrams, charts, text). Use "decorative" for aesthetics (backgrounds, stock photos).
-- "ocr_text": Extract all visible text. Return an empty string if there is no text.
-- "alt_text": Write a concise, descriptive alt text for accessibility, explaining the image's content and purpose.
-
-Your response MUST NOT include any explanations, introductory text, or markdown formatting like ```json. It must be ONLY the raw JSON object.""",
-        },
+        IMAGE_ANALYSIS_SYSTEM_MESSAGE,
         {
             "role": "user",
             "content": [
                 {"type": "image_url", "image_url": {"url": data_url}},
-                {"type": "text", "text": "Analyze the image per the system prompt."},
+                IMAGE_ANALYSIS_INSTRUCTION_PART,
             ],
         },
     ]
 
     for _ in range(MAX_RETRIES):
         try:
-            start_time = time.time()
-            response = await asyncio.wait_for(
-                client.chat.completions.parse(
-                    model=settings.image_analysis_model,
-                    messages=messages,
-                    response_format=ImageAnalysisResult,
-                ),
-                timeout=INITIAL_REQUEST_TIMEOUT,
-            )
-            latency = time.time() - start_time
+            # Time spent waiting for a slot does not count against the timeout
+            async with _analysis_semaphore:
+                start_time = time.perf_counter()
+                response = await asyncio.wait_for(
+                    client.chat.completions.parse(
+                        model=settings.image_analysis_model,
+                        messages=messages,
+                        response_format=ImageAnalysisResult,
+                        max_tokens=IMAGE_ANALYSIS_MAX_TOKENS,
+                    ),
+                    timeout=INITIAL_REQUEST_TIMEOUT,
+                )
+                latency = time.perf_counter() - start_time
 
             result = response.choices[0].message.parsed
             metadata = extract_metadata(response)
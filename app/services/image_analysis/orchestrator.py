@@ -1,17 +1,19 @@
+import asyncio
 import logging
 import json
 
 import asyncpg
 
+from app.services.chat.semantic_cache import invalidate_semantic_cache
 from app.services.image_analysis import db_utils, llm_utils, s3_utils
-from app.utils.config import Settings
+from app.utils.config import get_settings
 from app.schemas.image_analysis import ImageAnalysisPayload
 from app.utils.llm_utils import get_llm_context
 from app.utils.s3_utils import get_s3_client
 from app.utils.db_utils import verify_lecture_exists
 
 
-settings = Settings()
+settings = get_settings()
 
 
 async def process_image_analysis_job(
@@ -34,7 +36,6 @@ async def process_image_analysis_job(
 
     # Initialize resources
     conn = None
-    s3_client = None
     image_bytes = None
 
     if not settings.postgres_dsn:
@@ -57,9 +58,9 @@ async def process_image_analysis_job(
             logging.error(f"Storage path for slide_image {slide_image_id} not found.")
             return  # Acknowledge the message and stop.
 
-        # 3. Download image from S3
-        image_bytes = s3_utils.download_image(
-            s3_client, settings.s3_bucket_name, storage_path
+        # 3. Download image from S3 (blocking boto3 call, run off the event loop)
+        image_bytes = await asyncio.to_thread(
+            s3_utils.download_image, s3_client, settings.s3_bucket_name, storage_path
         )
 
         # 4. Fetch user API context (required)
@@ -96,6 +97,9 @@ async def process_image_analysis_job(
             # We still track this for progress monitoring, but it no longer triggers embeddings.
             await db_utils.increment_processed_images_count(conn, lecture_id)
 
+        # Cached retrieval results embed the old OCR and alt text
+        invalidate_semantic_cache(lecture_id)
+
     except Exception as e:
         logging.error(
             f"Image analysis job failed for slide_image_id {slide_image_id}: {e}",
@@ -118,7 +122,5 @@ async def process_image_analysis_job(
         # Clean up resources explicitly to prevent memory leaks
         if image_bytes is not None:
             del image_bytes
-        if s3_client:
-            s3_client.close()
         if conn:
             await conn.close()
@@ -3,10 +3,10 @@ import logging
 from uuid import UUID
 from typing import Optional
 
-from app.utils.config import Settings
+from app.utils.config import get_settings
 
 
-settings = Settings()
+settings = get_settings()
 
 _publisher = None
 
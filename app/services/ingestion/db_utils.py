@@ -1,3 +1,4 @@
+from typing import Dict
 from uuid import UUID
 
 import asyncpg
@@ -48,18 +49,19 @@ async def update_lecture_sub_image_count(
     )
 
 
-async def get_or_create_slide(
-    conn: asyncpg.Connection, lecture_id: UUID, slide_number: int, raw_text: str
-) -> UUID:
-    """Gets a slide if it exists, otherwise creates it and returns the new ID."""
-    slide_id = await conn.fetchval(
-        "SELECT id FROM slides WHERE lecture_id=$1 AND slide_number=$2",
+async def get_slide_ids(conn: asyncpg.Connection, lecture_id: UUID) -> Dict[int, UUID]:
+    """Returns the IDs of a lecture's existing slides, keyed by slide number."""
+    rows = await conn.fetch(
+        "SELECT id, slide_number FROM slides WHERE lecture_id=$1",
         lecture_id,
-        slide_number,
     )
-    if slide_id:
-        return slide_id
+    return {row["slide_number"]: row["id"] for row in rows}
 
+
+async def create_slide(
+    conn: asyncpg.Connection, lecture_id: UUID, slide_number: int, raw_text: str
+) -> UUID:
+    """Creates a slide, or updates the text of an existing one, and returns its ID."""
     safe_raw_text = sanitize_text(raw_text)
     return await conn.fetchval(
         """
@@ -75,39 +77,38 @@ async def get_or_create_slide(
     )
 
 
-async def get_or_create_chunk(
+async def insert_chunks(
     conn: asyncpg.Connection,
     slide_id: UUID,
     lecture_id: UUID,
     slide_number: int,
-    chunk_index: int,
-    text_chunk: str,
-    token_count: int,
-) -> UUID:
-    """Gets a chunk or creates it, returning its ID."""
-    chunk_id = await conn.fetchval(
-        "SELECT id FROM chunks WHERE slide_id=$1 AND chunk_index=$2",
-        slide_id,
-        chunk_index,
-    )
-    if chunk_id:
-        return chunk_id
+    chunks: list[tuple[str, int]],
+):
+    """
+    Inserts a slide's text chunks in one batch, keeping any that already exist.
+    'chunks' is a list of (text, token_count) in chunk_index order.
+    """
+    if not chunks:
+        return
 
-    safe_text = sanitize_text(text_chunk) or ""
-    return await conn.fetchval(
+    await conn.executemany(
         """
         INSERT INTO chunks
           (slide_id, lecture_id, slide_number, chunk_index, text, token_count)
         VALUES ($1, $2, $3, $4, $5, $6)
         ON CONFLICT (slide_id, chunk_index) DO NOTHING
-        RETURNING id
         """,
-        slide_id,
-        lecture_id,
-        slide_number,
-        chunk_index,
-        safe_text,
-        token_count,
+        [
+            (
+                slide_id,
+                lecture_id,
+                slide_number,
+                chunk_index,
+                sanitize_text(text_chunk) or "",
+                token_count,
+            )
+            for chunk_index, (text_chunk, token_count) in enumerate(chunks)
+        ],
     )
 
 
@@ -1,144 +1,246 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import io
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from uuid import UUID
-from typing import Dict, List, TYPE_CHECKING
+from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
 
 import asyncpg
 
 from app.services.ingestion.db_utils import insert_slide_image
 from app.services.ingestion.s3_utils import upload_image
-from app.utils.config import Settings
+from app.utils.config import get_settings
 
 if TYPE_CHECKING:
     import pymupdf
 
-settings = Settings()
+settings = get_settings()
+
+
+class PdfDocument:
+    """
+    A pymupdf document with its own worker thread.
+
+    pymupdf is not thread-safe, so every call on one document runs on that
+    document's single thread, in submission order. This keeps the event loop
+    free while pages are parsed and rendered, and separate documents (and so
+    separate ingestion jobs) are still processed in parallel.
+    """
+
+    def __init__(self, doc: pymupdf.Document, executor: ThreadPoolExecutor):
+        self.doc = doc
+        self.page_count = doc.page_count
+        self._executor = executor
+
+    @classmethod
+    async def open(cls, path: str) -> PdfDocument:
+        """Opens a PDF on a new worker thread."""
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pymupdf")
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, _open_pdf, path, executor)
+        except BaseException:
+            executor.shutdown(wait=False)
+            raise
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Runs func(doc, *args) on the document's worker thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, self.doc, *args)
+
+    async def close(self) -> None:
+        """
+        Closes the document once any call still running on its thread (e.g.
+        for a cancelled slide) has finished, then stops the thread.
+        """
+        try:
+            await self.run(_close_pdf)
+        finally:
+            self._executor.shutdown(wait=False)
+
+
+def _open_pdf(path: str, executor: ThreadPoolExecutor) -> PdfDocument:
+    """Opens a PDF; runs on the worker thread that will own it."""
+    import pymupdf
+
+    return PdfDocument(pymupdf.open(path), executor)
+
+
+def _close_pdf(doc: pymupdf.Document) -> None:
+    """Closes a PDF; runs on the worker thread that owns it."""
+    doc.close()
+
+
+def _render_slide(doc: pymupdf.Document, page_index: int) -> tuple[int, int, bytes]:
+    """Rasterizes a slide and returns its pixmap width, height and RGB samples."""
+    import pymupdf
+
+    page = doc.load_page(page_index)
+    # Use a higher DPI for better quality
+    pix = page.get_pixmap(matrix=pymupdf.Matrix(2, 2))
+    return pix.width, pix.height, pix.samples
+
+
+def _get_image_xrefs(doc: pymupdf.Document, page_index: int) -> List[int]:
+    """Returns the xrefs of the images embedded in a slide."""
+    page = doc.load_page(page_index)
+    return [img_ref[0] for img_ref in page.get_images(full=True)]
+
+
+def _extract_image(doc: pymupdf.Document, xref: int) -> Dict:
+    """Returns the raw bytes and metadata of an embedded image."""
+    return doc.extract_image(xref)
+
+
+def _encode_slide_render(width: int, height: int, samples: bytes) -> tuple[str, bytes]:
+    """Computes the perceptual hash of a rendered slide and encodes it as PNG."""
+    import imagehash
+    from PIL import Image
+
+    img = Image.frombytes("RGB", [width, height], samples)
+    phash = str(imagehash.phash(img))
+
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return phash, buffer.getvalue()
+
+
+def _hash_sub_image(img_bytes: bytes) -> str:
+    """Computes the perceptual hash of an embedded image."""
+    import imagehash
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(img_bytes)).convert("RGB")
+    return str(imagehash.phash(img))
+
+
+async def _upload_sub_image(
+    s3_client, storage_key: str, img_bytes: bytes, ext: str
+) -> str:
+    """Uploads an embedded image to S3 and returns its storage path."""
+    await asyncio.to_thread(
+        upload_image,
+        s3_client,
+        settings.s3_bucket_name,
+        storage_key,
+        img_bytes,
+        f"image/{ext}",
+    )
+    return storage_key
 
 
 async def render_and_upload_slide_image(
-    doc: pymupdf.Document,
+    pdf: PdfDocument,
     s3_client,
-    conn: asyncpg.Connection,
     page_index: int,
     lecture_id: UUID,
-    slide_id: UUID,
-):
+) -> Optional[Tuple[str, str]]:
     """
-    Renders a full-resolution image of a slide, uploads it to S3,
-    and saves its metadata to the database.
+    Renders a full-resolution image of a slide and uploads it to S3.
+    Returns its (image_hash, storage_path), or None if rendering or upload failed.
     """
-    import imagehash
-    import pymupdf
-    from PIL import Image
-
     slide_number = page_index + 1
-    page = doc.load_page(page_index)
-    storage_path = ""
 
     try:
-        # Use a higher DPI for better quality
-        matrix = pymupdf.Matrix(2, 2)
-        pix = page.get_pixmap(matrix=matrix)
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-        phash = str(imagehash.phash(img))
-
-        buffer = io.BytesIO()
-        img.save(buffer, format="PNG")
-        img_data = buffer.getvalue()
-
-        storage_key = f"lectures/{lecture_id}/slides/{slide_number}/full_slide.png"
-        upload_image(
-            s3_client, settings.s3_bucket_name, storage_key, img_data, "image/png"
+        width, height, samples = await pdf.run(_render_slide, page_index)
+        # PNG compression and hashing are CPU-bound; PIL releases the GIL while
+        # encoding, so slides processed concurrently encode in parallel
+        phash, img_data = await asyncio.to_thread(
+            _encode_slide_render, width, height, samples
         )
-        storage_path = storage_key
 
-        await insert_slide_image(
-            conn,
-            slide_id=slide_id,
-            lecture_id=lecture_id,
-            image_hash=phash,
-            storage_path=storage_path,
-            image_type="full_slide_render",
+        storage_key = f"lectures/{lecture_id}/slides/{slide_number}/full_slide.png"
+        await asyncio.to_thread(
+            upload_image,
+            s3_client,
+            settings.s3_bucket_name,
+            storage_key,
+            img_data,
+            "image/png",
         )
+        return phash, storage_key
 
     except Exception as e:
         logging.error(
             f"Failed to render or upload full slide image for slide {slide_number}: {e}"
         )
         # Depending on requirements, you might want to re-raise or handle differently
-    return storage_path
+        return None
 
 
-async def process_slide_sub_images(
-    doc: pymupdf.Document,
+async def upload_slide_sub_images(
+    pdf: PdfDocument,
     s3_client,
-    conn: asyncpg.Connection,
     page_index: int,
     lecture_id: UUID,
-    slide_id: UUID,
-    processed_images_map: Dict[str, str],
+    processed_images_map: Dict[str, asyncio.Task[str]],
+    phash_cache: Dict[bytes, str],
 ) -> List[Dict]:
     """
-    Extracts all sub-images from a slide, uploads new ones, records them in the
-    database, and returns a list of analysis jobs to be published for new images.
+    Extracts all sub-images from a slide and uploads the ones not seen before.
+    Returns one entry per image with its 'image_hash', 'storage_path' and
+    whether it 'is_new_image' to this lecture, ready for save_slide_images.
+    'processed_images_map' maps each image hash seen in this lecture to the task
+    uploading it, which resolves to its storage path.
+    'phash_cache' maps a content digest of image bytes already seen in this
+    lecture to their perceptual hash, so repeated images are not decoded again.
     """
-    import imagehash
-    from PIL import Image
 
-    page = doc.load_page(page_index)
     slide_number = page_index + 1
-    images = page.get_images(full=True)
-    image_analysis_jobs = []
+    xrefs = await pdf.run(_get_image_xrefs, page_index)
+    sub_images = []
 
-    if not images:
-        return image_analysis_jobs
+    if not xrefs:
+        return sub_images
 
-    for img_ref in images:
-        xref = img_ref[0]
+    for xref in xrefs:
         try:
-            img_info = doc.extract_image(xref)
+            img_info = await pdf.run(_extract_image, xref)
             img_bytes = img_info["image"]
-            img = Image.open(io.BytesIO(img_bytes)).convert("RGB")
-            image_hash = str(imagehash.phash(img))
-
-            storage_path = processed_images_map.get(image_hash)
-            is_new_image = storage_path is None
-
-            if is_new_image:
-                # This is a new, unique image. Upload it.
-                ext = img_info.get("ext", "png")
-                storage_key = f"lectures/{lecture_id}/images/{image_hash}.{ext}"
-                upload_image(
-                    s3_client,
-                    settings.s3_bucket_name,
-                    storage_key,
-                    img_bytes,
-                    f"image/{ext}",
-                )
-                storage_path = storage_key
-                processed_images_map[image_hash] = storage_path
-
-            # Create a record for this image instance on this specific slide
-            slide_image_id = await insert_slide_image(
-                conn,
-                slide_id=slide_id,
-                lecture_id=lecture_id,
-                image_hash=image_hash,
-                storage_path=storage_path,
-                image_type=None,  # Type will be determined by the analysis service
-            )
+            digest = hashlib.blake2b(img_bytes, digest_size=16).digest()
+            image_hash = phash_cache.get(digest)
+            if image_hash is None:
+                image_hash = await asyncio.to_thread(_hash_sub_image, img_bytes)
+                phash_cache[digest] = image_hash
+
+            # Each unique image is uploaded once per lecture. A slide that meets
+            # an image whose upload is still in flight waits for it, and takes
+            # over the upload if it fails.
+            is_new_image = False
+            while True:
+                upload = processed_images_map.get(image_hash)
+                if upload is None:
+                    is_new_image = True
+                    ext = img_info.get("ext", "png")
+                    upload = asyncio.create_task(
+                        _upload_sub_image(
+                            s3_client,
+                            f"lectures/{lecture_id}/images/{image_hash}.{ext}",
+                            img_bytes,
+                            ext,
+                        )
+                    )
+                    processed_images_map[image_hash] = upload
+                try:
+                    storage_path = await upload
+                    break
+                except Exception:
+                    # Release the claim so this or a later occurrence can retry
+                    if processed_images_map.get(image_hash) is upload:
+                        del processed_images_map[image_hash]
+                    if is_new_image:
+                        raise
 
-            if is_new_image:
-                # Append a job payload for the newly uploaded image
-                image_analysis_jobs.append(
-                    {
-                        "slide_image_id": slide_image_id,
-                        "lecture_id": lecture_id,
-                        "image_hash": image_hash,
-                    }
-                )
+            sub_images.append(
+                {
+                    "image_hash": image_hash,
+                    "storage_path": storage_path,
+                    "is_new_image": is_new_image,
+                }
+            )
 
         except Exception as e:
             logging.error(
@@ -147,4 +249,50 @@ async def process_slide_sub_images(
             )
             # Continue processing other images even if one fails
             continue
+    return sub_images
+
+
+async def save_slide_images(
+    conn: asyncpg.Connection,
+    lecture_id: UUID,
+    slide_id: UUID,
+    slide_render: Optional[Tuple[str, str]],
+    sub_images: List[Dict],
+) -> List[Dict]:
+    """
+    Records a slide's uploaded full render and sub-images in the database.
+    Returns the analysis jobs to be published for images new to this lecture.
+    """
+    if slide_render:
+        phash, storage_path = slide_render
+        await insert_slide_image(
+            conn,
+            slide_id=slide_id,
+            lecture_id=lecture_id,
+            image_hash=phash,
+            storage_path=storage_path,
+            image_type="full_slide_render",
+        )
+
+    image_analysis_jobs = []
+    for sub_image in sub_images:
+        # Create a record for this image instance on this specific slide
+        slide_image_id = await insert_slide_image(
+            conn,
+            slide_id=slide_id,
+            lecture_id=lecture_id,
+            image_hash=sub_image["image_hash"],
+            storage_path=sub_image["storage_path"],
+            image_type=None,  # Type will be determined by the analysis service
+        )
+
+        if sub_image["is_new_image"]:
+            # Append a job payload for the newly uploaded image
+            image_analysis_jobs.append(
+                {
+                    "slide_image_id": slide_image_id,
+                    "lecture_id": lecture_id,
+                    "image_hash": sub_image["image_hash"],
+                }
+            )
     return image_analysis_jobs
@@ -1,34 +1,113 @@
+import asyncio
 import logging
-from typing import Dict
+from typing import Dict, List, TYPE_CHECKING
+from uuid import UUID
 from app.schemas.ingestion import IngestionPayload
+from app.services.chat.semantic_cache import invalidate_semantic_cache
 
 import asyncpg
 import json
 import os
 import tempfile
 from app.services.ingestion.db_utils import (
-    get_or_create_chunk,
-    get_or_create_slide,
+    create_slide,
+    get_slide_ids,
+    insert_chunks,
     set_lecture_parsing,
     update_lecture_sub_image_count,
     update_lecture_status,
 )
 from app.services.ingestion.image_processing import (
-    process_slide_sub_images,
+    PdfDocument,
     render_and_upload_slide_image,
+    save_slide_images,
+    upload_slide_sub_images,
 )
 from app.services.ingestion.s3_utils import download_pdf_to_file
 from app.services.ingestion.text_processing import chunk_text_by_tokens
 from app.services.ingestion.pubsub_utils import (
     publish_embedding_job,
-    publish_image_analysis_job,
+    publish_image_analysis_jobs,
 )
-from app.utils.config import Settings
+from app.utils.config import get_settings
 from app.utils.s3_utils import get_s3_client
-from app.utils.db_utils import verify_lecture_exists
+from app.utils.db_utils import get_db_pool, verify_lecture_exists
 
+if TYPE_CHECKING:
+    import pymupdf
+
+settings = get_settings()
+
+
+def _get_page_text(doc: "pymupdf.Document", page_index: int) -> str:
+    """Extracts the plain text of a slide."""
+    return doc.load_page(page_index).get_text("text")
+
+
+async def _process_page(
+    pool: asyncpg.Pool,
+    semaphore: asyncio.Semaphore,
+    pdf: PdfDocument,
+    s3_client,
+    page_index: int,
+    lecture_id: UUID,
+    existing_slide_ids: Dict[int, UUID],
+    processed_images_map: Dict[str, asyncio.Task[str]],
+    phash_cache: Dict[bytes, str],
+) -> List[Dict]:
+    """
+    Stores one slide with its text chunks and images. Rendering and uploads
+    happen first, so a pooled connection is only held for the slide's writes.
+    Returns the image analysis jobs for images first seen on this slide.
+    """
+    async with semaphore:
+        slide_number = page_index + 1
+        raw_text = await pdf.run(_get_page_text, page_index)
+        chunks = chunk_text_by_tokens(raw_text)
+
+        # 1. Render and upload images
+        slide_render = await render_and_upload_slide_image(
+            pdf, s3_client, page_index, lecture_id
+        )
+        sub_images = await upload_slide_sub_images(
+            pdf,
+            s3_client,
+            page_index,
+            lecture_id,
+            processed_images_map,
+            phash_cache,
+        )
+
+        async with pool.acquire() as conn, conn.transaction():
+            # 2. Create the slide; slides kept from an earlier attempt are
+            # reused as they are
+            slide_id = existing_slide_ids.get(slide_number)
+            if slide_id is None:
+                slide_id = await create_slide(conn, lecture_id, slide_number, raw_text)
 
-settings = Settings()
+            # 3. Create text chunks and record the images
+            await insert_chunks(conn, slide_id, lecture_id, slide_number, chunks)
+            return await save_slide_images(
+                conn, lecture_id, slide_id, slide_render, sub_images
+            )
+
+
+async def _prepare_lecture(pool: asyncpg.Pool, lecture_id: UUID) -> bool:
+    """
+    Verifies the lecture can be ingested and clears errors from earlier attempts.
+    Returns False if the lecture is missing or in a terminal state.
+    """
+    async with pool.acquire() as conn:
+        # Verify the lecture exists before proceeding (Defensive Subscriber)
+        if not await verify_lecture_exists(conn, lecture_id):
+            return False
+
+        # Clear any previous embedding-track errors since we're starting fresh
+        await conn.execute(
+            "UPDATE lectures SET embedding_error_details = NULL WHERE id = $1",
+            lecture_id,
+        )
+        return True
 
 
 async def ingest(
@@ -51,122 +130,129 @@ async def ingest(
         logging.error("Postgres DSN not configured")
         raise RuntimeError("Postgres DSN not configured")
 
-    conn = None
-    doc = None
+    pool = None
+    pdf = None
     tmp_path = None
-    import pymupdf
 
-    s3_client = None
     try:
         s3_client = get_s3_client()
-        conn = await asyncpg.connect(settings.postgres_dsn, statement_cache_size=0)
+        pool = await get_db_pool()
 
-        # Verify the lecture exists before proceeding (Defensive Subscriber)
-        if not await verify_lecture_exists(conn, lecture_id):
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            tmp_path = tmp.name
+
+        # Download the PDF while the lecture is verified; the download thread
+        # cannot be cancelled, so both are awaited before acting on either
+        lecture_ready, downloaded = await asyncio.gather(
+            _prepare_lecture(pool, lecture_id),
+            asyncio.to_thread(
+                download_pdf_to_file,
+                s3_client,
+                settings.s3_bucket_name,
+                storage_path,
+                tmp_path,
+            ),
+            return_exceptions=True,
+        )
+        if isinstance(lecture_ready, BaseException):
+            raise lecture_ready
+        if not lecture_ready:
             logging.warning(
                 f"Lecture with ID {lecture_id} not found. Acknowledging message and stopping."
             )
             return
+        if isinstance(downloaded, BaseException):
+            raise downloaded
 
-        # Clear any previous embedding-track errors since we're starting fresh
-        await conn.execute(
-            "UPDATE lectures SET embedding_error_details = NULL WHERE id = $1",
-            lecture_id,
-        )
-
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-            tmp_path = tmp.name
+        pdf = await PdfDocument.open(tmp_path)
+        total_slides = pdf.page_count
 
-        download_pdf_to_file(s3_client, settings.s3_bucket_name, storage_path, tmp_path)
-        doc = pymupdf.open(tmp_path)
-        total_slides = doc.page_count
-
-        await set_lecture_parsing(conn, lecture_id, total_slides)
-        processed_images_map: Dict[str, str] = {}
-        image_analysis_jobs = []
-        for page_index in range(total_slides):
-            slide_number = page_index + 1
-            page = doc.load_page(page_index)
-
-            async with conn.transaction():
-                raw_text = page.get_text("text")
-                slide_id = await get_or_create_slide(
-                    conn, lecture_id, slide_number, raw_text
-                )
+        async with pool.acquire() as conn:
+            await set_lecture_parsing(conn, lecture_id, total_slides)
+            existing_slide_ids = await get_slide_ids(conn, lecture_id)
 
-                # 2. Create text chunks
-                chunks = chunk_text_by_tokens(raw_text)
-                for idx, (text_chunk, token_count) in enumerate(chunks):
-                    await get_or_create_chunk(
-                        conn,
-                        slide_id,
-                        lecture_id,
-                        slide_number,
-                        idx,
-                        text_chunk,
-                        token_count,
-                    )
-
-                # 3. Render and process images
-                await render_and_upload_slide_image(
-                    doc, s3_client, conn, page_index, lecture_id, slide_id
-                )
-                new_jobs = await process_slide_sub_images(
-                    doc,
+        # Slides are processed concurrently, each in its own transaction.
+        # Sub-image dedup claims each hash in the map before uploading it.
+        processed_images_map: Dict[str, asyncio.Task[str]] = {}
+        phash_cache: Dict[bytes, str] = {}
+        semaphore = asyncio.Semaphore(settings.ingestion_page_concurrency)
+        page_tasks = [
+            asyncio.create_task(
+                _process_page(
+                    pool,
+                    semaphore,
+                    pdf,
                     s3_client,
-                    conn,
                     page_index,
                     lecture_id,
-                    slide_id,
+                    existing_slide_ids,
                     processed_images_map,
+                    phash_cache,
                 )
-                image_analysis_jobs.extend(new_jobs)
+            )
+            for page_index in range(total_slides)
+        ]
+        try:
+            page_jobs = await asyncio.gather(*page_tasks)
+        except BaseException:
+            # Stop the remaining slides before the document is closed, then
+            # any sub-image uploads they started
+            for task in page_tasks:
+                task.cancel()
+            await asyncio.gather(*page_tasks, return_exceptions=True)
+            uploads = list(processed_images_map.values())
+            for upload in uploads:
+                upload.cancel()
+            await asyncio.gather(*uploads, return_exceptions=True)
+            raise
+        image_analysis_jobs = [job for jobs in page_jobs for job in jobs]
 
         # Post-loop operations
         total_sub_images = len(processed_images_map)
-        await update_lecture_sub_image_count(conn, lecture_id, total_sub_images)
+        async with pool.acquire() as conn:
+            await update_lecture_sub_image_count(conn, lecture_id, total_sub_images)
+
+            # We now set status to 'processing' while embeddings/images are being handled
+            await update_lecture_status(conn, lecture_id, "processing")
 
-        # We now set status to 'processing' while embeddings/images are being handled
-        await update_lecture_status(conn, lecture_id, "processing")
+        # Cached retrieval results refer to the lecture's previous content
+        invalidate_semantic_cache(lecture_id)
 
         # DISPATCH: Always publish the embedding job immediately after parsing.
         # Image analysis jobs are also published and will run concurrently.
         # The embedding job no longer waits for or uses image analysis content.
-        publish_embedding_job(
+        await asyncio.to_thread(
+            publish_embedding_job,
             lecture_id,
             customer_identifier=customer_identifier,
             name=name,
             email=email,
         )
 
-        if total_sub_images > 0:
-            for job in image_analysis_jobs:
-                publish_image_analysis_job(
-                    slide_image_id=job["slide_image_id"],
-                    lecture_id=job["lecture_id"],
-                    image_hash=job["image_hash"],
-                    customer_identifier=customer_identifier,
-                    name=name,
-                    email=email,
-                )
+        if total_sub_images > 0 and image_analysis_jobs:
+            # Published as one batch; the client groups them into few requests
+            await asyncio.to_thread(
+                publish_image_analysis_jobs,
+                image_analysis_jobs,
+                customer_identifier=customer_identifier,
+                name=name,
+                email=email,
+            )
 
     except Exception as e:
         logging.error(f"Ingestion failed for lecture {lecture_id}: {e}", exc_info=True)
-        if conn:
+        if pool:
             error_info = {"service": "ingestion", "error": str(e)}
-            await update_lecture_status(
-                conn,
-                lecture_id,
-                "failed",
-                embedding_error_details=json.dumps(error_info),
-            )
+            async with pool.acquire() as conn:
+                await update_lecture_status(
+                    conn,
+                    lecture_id,
+                    "failed",
+                    embedding_error_details=json.dumps(error_info),
+                )
         raise
     finally:
-        if doc:
-            doc.close()
+        if pdf:
+            await pdf.close()
         if tmp_path and os.path.exists(tmp_path):
             os.remove(tmp_path)
-        if s3_client:
-            s3_client.close()
-        if conn:
-            await conn.close()
@@ -1,12 +1,12 @@
 import json
 import logging
 from uuid import UUID
-from typing import Optional
+from typing import Dict, List, Optional
 
-from app.utils.config import Settings
+from app.utils.config import get_settings
 
 
-settings = Settings()
+settings = get_settings()
 
 _publisher = None
 
@@ -44,27 +44,58 @@ def _publish_message(topic_name: str, data: dict):
         raise
 
 
-def publish_image_analysis_job(
-    slide_image_id: UUID,
-    lecture_id: UUID,
-    image_hash: str,
+def _publish_messages(topic_name: str, data_list: List[dict]):
+    """
+    Publishes several messages to a Pub/Sub topic, letting the client batch them,
+    and waits for all of them. Raises the first failure after all have settled.
+    """
+    if not settings.gcp_project_id:
+        logging.error("GCP_PROJECT_ID is not set. Cannot publish message.")
+        return
+
+    publisher = get_publisher()
+    topic_path = publisher.topic_path(settings.gcp_project_id, topic_name)
+    futures = [
+        publisher.publish(topic_path, json.dumps(data).encode("utf-8"))
+        for data in data_list
+    ]
+
+    first_error = None
+    for future in futures:
+        try:
+            future.result()  # Wait for the message to be published
+        except Exception as e:
+            logging.error(f"Failed to publish message to {topic_path}: {e}")
+            first_error = first_error or e
+    if first_error:
+        raise first_error
+
+
+def publish_image_analysis_jobs(
+    jobs: List[Dict],
     customer_identifier: str,
     name: Optional[str],
     email: Optional[str],
 ):
-    """Publishes a job to the image-analysis topic with customer tracking."""
+    """
+    Publishes jobs to the image-analysis topic with customer tracking.
+    Each job carries slide_image_id, lecture_id and image_hash.
+    """
     if not settings.image_analysis_topic:
         logging.warning("IMAGE_ANALYSIS_TOPIC not set, skipping job submission.")
         return
-    data = {
-        "slide_image_id": str(slide_image_id),
-        "lecture_id": str(lecture_id),
-        "image_hash": image_hash,
-        "customer_identifier": customer_identifier,
-        "name": name,
-        "email": email,
-    }
-    _publish_message(settings.image_analysis_topic, data)
+    data_list = [
+        {
+            "slide_image_id": str(job["slide_image_id"]),
+            "lecture_id": str(job["lecture_id"]),
+            "image_hash": job["image_hash"],
+            "customer_identifier": customer_identifier,
+            "name": name,
+            "email": email,
+        }
+        for job in jobs
+    ]
+    _publish_messages(settings.image_analysis_topic, data_list)
 
 
 def publish_embedding_job(
@@ -1,11 +1,28 @@
 import logging
+import time
+from functools import lru_cache
+from typing import Any, Dict
+
 from fastapi import Request, HTTPException, status, Header
 from google.oauth2 import id_token
 from google.auth.transport import requests
 
-from app.utils.config import Settings
+from app.utils.config import get_settings
+
+settings = get_settings()
+
+# Shared transport for fetching Google's signing certificates
+_auth_request = requests.Request()
 
-settings = Settings()
+
+@lru_cache(maxsize=256)
+def _verify_pubsub_jwt(token: str, audience: str) -> Dict[str, Any]:
+    """
+    Verifies a Pub/Sub push JWT and returns its claims.
+    Successful verifications are cached per token, so redeliveries carrying the
+    same token skip the signature check; failures raise and are not cached.
+    """
+    return id_token.verify_oauth2_token(token, _auth_request, audience=audience)
 
 
 async def verify_token(request: Request, authorization: str = Header(None)):
@@ -43,9 +60,7 @@ async def verify_token(request: Request, authorization: str = Header(None)):
     audience = f"{settings.pubsub_base_url}{request.url.path}"
 
     try:
-        decoded_token = id_token.verify_oauth2_token(
-            token, requests.Request(), audience=audience
-        )
+        decoded_token = _verify_pubsub_jwt(token, audience)
     except ValueError as e:
         logging.error(f"Failed to validate Pub/Sub JWT: {e}")
         raise HTTPException(
@@ -53,6 +68,14 @@ async def verify_token(request: Request, authorization: str = Header(None)):
             detail="Unauthorized: invalid token",
         )
 
+    # Cached claims outlive the verification, so expiry is re-checked every time
+    if decoded_token.get("exp", 0) < time.time():
+        logging.warning("Expired Pub/Sub JWT")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Unauthorized: token expired",
+        )
+
     email = decoded_token.get("email")
     if not email:
         logging.error("Email claim missing or invalid in Pub/Sub JWT")
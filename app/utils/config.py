@@ -1,5 +1,9 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+__all__ = ["Settings", "get_settings"]
+
 
 class Settings(BaseSettings):
     # --- Local & Github Secrets ---
@@ -61,15 +65,50 @@ class Settings(BaseSettings):
     # DeepSeek
     deepseek_api_base_url: str = "https://api.deepseek.com"
 
+    # LLM requests (OpenAI-compatible clients)
+    llm_timeout_seconds: float = 120.0
+    llm_max_retries: int = 2
+
+    # Embedding batching (Gemini accepts at most 100 texts per request)
+    embedding_batch_size: int = 100
+    embedding_max_concurrency: int = 4
+
+    # Embedding cache (in-process, per instance)
+    embedding_cache_max_entries: int = 512
+
     # Models
     embedding_model: str = "gemini-embedding-001"
     image_analysis_model: str = "gemini-2.5-flash-lite"
     query_rewriter_model: str = "gemini-2.5-flash-lite"
     title_model: str = "gemini-2.5-flash-lite"
 
+    # Image analysis (LLM calls in flight per instance)
+    image_analysis_max_concurrency: int = 8
+
+    # Ingestion (slides processed concurrently per job; a slide only holds a
+    # pooled connection while writing its rows)
+    ingestion_page_concurrency: int = 4
+
+    # Postgres pool
+    db_pool_min_size: int = 1
+    db_pool_max_size: int = 10
+
     # RAG
     rag_top_k: int = 5
-
+    # Off by default: entries are only invalidated on the instance that
+    # re-ingests or re-analyzes a lecture
+    semantic_cache_enabled: bool = False
+    semantic_cache_threshold: float = 0.95
+    semantic_cache_ttl_seconds: int = 3600
+    semantic_cache_max_entries: int = 2048
+
+    # Frozen since the one cached instance is shared by every module
     model_config = SettingsConfigDict(
-        env_file=".env", env_file_encoding="utf-8", extra="ignore"
+        env_file=".env", env_file_encoding="utf-8", extra="ignore", frozen=True
     )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Returns the process-wide Settings instance, built on first use."""
+    return Settings()
@@ -1,8 +1,48 @@
+import asyncio
 import logging
+from typing import Optional
 from uuid import UUID
 
 import asyncpg
 
+from app.utils.config import get_settings
+
+# Global connection pool, created on first use
+_db_pool: Optional[asyncpg.Pool] = None
+_db_pool_lock = asyncio.Lock()
+
+
+async def get_db_pool() -> asyncpg.Pool:
+    """Get or initialize the shared asyncpg connection pool."""
+    global _db_pool
+
+    if _db_pool is None:
+        async with _db_pool_lock:
+            if _db_pool is None:
+                settings = get_settings()
+                # Statement cache disabled: the transaction pooler cannot hold
+                # named prepared statements across transactions
+                _db_pool = await asyncpg.create_pool(
+                    settings.postgres_dsn,
+                    min_size=settings.db_pool_min_size,
+                    max_size=settings.db_pool_max_size,
+                    statement_cache_size=0,
+                )
+
+    return _db_pool
+
+
+async def close_db_pool() -> None:
+    """Close the shared asyncpg connection pool."""
+    global _db_pool
+    if _db_pool:
+        try:
+            await _db_pool.close()
+        except Exception as e:
+            logging.error(f"Error closing database pool: {e}")
+        finally:
+            _db_pool = None
+
 
 async def verify_lecture_exists(
     conn: asyncpg.Connection, lecture_id: UUID, allow_complete: bool = False
@@ -1,24 +1,62 @@
+import asyncio
+import hashlib
 import logging
-import json
 import time
+from collections import OrderedDict
 from typing import List, Dict, Any, Tuple
-from app.utils.config import Settings
+from app.utils.config import get_settings
 from app.utils.secret_manager import InvalidAPIKeyError
 from app.utils.llm_utils import is_authentication_error
 from app.utils.posthog_client import get_posthog_client
 from app.utils.model_provider_mapping import get_provider_for_model
+import orjson
 from google.genai import types
 
-settings = Settings()
+settings = get_settings()
 
+# Output dimensionality requested from the embedding model (matches vector(1536))
+EMBEDDING_DIMENSIONS = 1536
 
-def _create_posthog_properties(
-    lecture_id: str | None, chat_id: str | None, texts_count: int
-) -> dict:
-    """Creates PostHog properties dictionary for tracking."""
-    properties = {
-        "texts_count": texts_count,
-    }
+# Per-item metadata is stored as an empty JSON object to avoid redundancy
+EMPTY_METADATA_JSON = "{}"
+
+# In-process LRU of vector strings keyed by (model, task_type, sha256(text));
+# only touched from the event loop, so no lock is needed
+_embedding_cache: OrderedDict[tuple[str, str, bytes], str] = OrderedDict()
+
+
+def _embedding_cache_key(text: str, task_type: str) -> tuple[str, str, bytes]:
+    """Builds the cache key for a text embedded with the configured model."""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return settings.embedding_model, task_type, digest
+
+
+def _get_cached_vectors(keys: List[tuple[str, str, bytes]]) -> List[str | None]:
+    """Returns the cached vector string for each key, or None on a miss."""
+    vectors: List[str | None] = []
+    for key in keys:
+        vector = _embedding_cache.get(key)
+        if vector is not None:
+            _embedding_cache.move_to_end(key)
+        vectors.append(vector)
+    return vectors
+
+
+def _cache_vectors(items: List[tuple[tuple[str, str, bytes], str]]) -> None:
+    """Stores vector strings, evicting the least recently used beyond capacity."""
+    max_entries = settings.embedding_cache_max_entries
+    if max_entries <= 0:
+        return
+    for key, vector in items:
+        _embedding_cache[key] = vector
+        _embedding_cache.move_to_end(key)
+    while len(_embedding_cache) > max_entries:
+        _embedding_cache.popitem(last=False)
+
+
+def _create_posthog_properties(lecture_id: str | None, chat_id: str | None) -> dict:
+    """Creates the PostHog properties shared by every batch of a call."""
+    properties = {}
     if lecture_id:
         properties["lecture_id"] = lecture_id
     if chat_id:
@@ -71,7 +109,39 @@ def _capture_posthog_event(
         logging.warning(f"Failed to capture PostHog event: {e}")
 
 
-def generate_embeddings(
+async def _embed_batch(
+    texts: List[str],
+    *,
+    client: Any,
+    task_type: str,
+    semaphore: asyncio.Semaphore,
+) -> Tuple[List[str], Any, float]:
+    """Embeds one batch and returns its vector strings, raw response and latency."""
+    async with semaphore:
+        start_time = time.perf_counter()
+        response = await client.aio.models.embed_content(
+            model=settings.embedding_model,
+            contents=texts,
+            config=types.EmbedContentConfig(
+                output_dimensionality=EMBEDDING_DIMENSIONS, task_type=task_type
+            ),
+        )
+        latency = time.perf_counter() - start_time
+
+    data_list = getattr(response, "embeddings", None) or []
+    if len(data_list) != len(texts):
+        raise ValueError(
+            f"Embedding API returned {len(data_list)} vectors for {len(texts)} texts"
+        )
+
+    vectors = [
+        orjson.dumps(getattr(data_item, "values", None)).decode()
+        for data_item in data_list
+    ]
+    return vectors, response, latency
+
+
+async def generate_embeddings(
     texts: List[str],
     lecture_id: str | None = None,
     chat_id: str | None = None,
@@ -81,13 +151,16 @@ def generate_embeddings(
 ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Generate embedding vectors for a batch of text chunks.
+    Texts already embedded by this process are served from an in-process cache;
+    the misses are sent to the API in batches of settings.embedding_batch_size,
+    with up to settings.embedding_max_concurrency requests in flight.
 
     Args:
         texts: List of text strings to generate embeddings for.
         lecture_id: Optional unique identifier for the lecture.
         chat_id: Optional unique identifier for the chat.
         user_id: Unique identifier for the user.
-        client: Client for generating embeddings (AsyncOpenAI or AsyncClient).
+        client: Client for generating embeddings (google.genai Client).
 
     Returns:
         A tuple containing a list of embedding results (with vector and metadata)
@@ -103,38 +176,59 @@ def generate_embeddings(
     span_name = "lecture_embedding" if lecture_id else "chat_embedding"
     task_type = "RETRIEVAL_DOCUMENT" if lecture_id else "RETRIEVAL_QUERY"
 
-    posthog_properties = _create_posthog_properties(lecture_id, chat_id, len(texts))
+    # Only texts without a cached vector are sent to the API
+    cache_keys = [_embedding_cache_key(text, task_type) for text in texts]
+    vectors = _get_cached_vectors(cache_keys)
+    miss_indices = [i for i, vector in enumerate(vectors) if vector is None]
 
     try:
-        start_time = time.time()
-        response = client.models.embed_content(
-            model=settings.embedding_model,
-            contents=texts,
-            config=types.EmbedContentConfig(
-                output_dimensionality=1536, task_type=task_type
-            ),
-        )
-        latency = time.time() - start_time
-
-        results: List[Dict[str, Any]] = []
-        data_list = getattr(response, "embeddings", [])
-
-        for data_item in data_list:
-            embedding = getattr(data_item, "values", None)
-            vector_str = json.dumps(embedding)
-            # Store an empty object for per-item metadata to avoid redundancy
-            results.append({"vector": vector_str, "metadata": json.dumps({})})
-
-        _capture_posthog_event(
-            user_id=user_id,
-            trace_id=trace_id,
-            span_name=span_name,
-            texts=texts,
-            response=response,
-            latency=latency,
-            task_type=task_type,
-            posthog_properties=posthog_properties,
-        )
+        if miss_indices:
+            batch_size = settings.embedding_batch_size
+            batches = [
+                miss_indices[i : i + batch_size]
+                for i in range(0, len(miss_indices), batch_size)
+            ]
+            semaphore = asyncio.Semaphore(settings.embedding_max_concurrency)
+            base_properties = _create_posthog_properties(lecture_id, chat_id)
+            batch_results = await asyncio.gather(
+                *(
+                    _embed_batch(
+                        [texts[i] for i in batch],
+                        client=client,
+                        task_type=task_type,
+                        semaphore=semaphore,
+                    )
+                    for batch in batches
+                )
+            )
+
+            new_items = []
+            for batch, (batch_vectors, response, latency) in zip(
+                batches, batch_results
+            ):
+                for i, vector in zip(batch, batch_vectors):
+                    vectors[i] = vector
+                    new_items.append((cache_keys[i], vector))
+
+                batch_texts = [texts[i] for i in batch]
+                _capture_posthog_event(
+                    user_id=user_id,
+                    trace_id=trace_id,
+                    span_name=span_name,
+                    texts=batch_texts,
+                    response=response,
+                    latency=latency,
+                    task_type=task_type,
+                    posthog_properties={
+                        **base_properties,
+                        "texts_count": len(batch_texts),
+                    },
+                )
+            _cache_vectors(new_items)
+
+        results: List[Dict[str, Any]] = [
+            {"vector": vector, "metadata": EMPTY_METADATA_JSON} for vector in vectors
+        ]
 
         common_metadata = {
             "model": settings.embedding_model,
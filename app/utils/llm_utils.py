@@ -1,10 +1,12 @@
 """Utility functions for working with LLM providers."""
 
+import asyncio
 import logging
+import re
 from uuid import UUID
 from typing import Dict, Any
 
-from app.utils.config import Settings
+from app.utils.config import get_settings
 from app.utils.secret_manager import (
     get_user_api_key,
     SecretNotFoundError,
@@ -19,7 +21,15 @@ from app.utils.posthog_client import (
 
 
 # Initialize settings
-settings = Settings()
+settings = get_settings()
+
+# HTTP statuses returned for a missing, invalid or unauthorized API key
+AUTH_ERROR_STATUS_CODES = (401, 403)
+
+# Matches auth failures in error messages from SDKs without typed errors
+_AUTH_ERROR_RE = re.compile(
+    r"authentication|unauthorized|invalid\s+api\s+key|\b401\b", re.IGNORECASE
+)
 
 
 def extract_metadata(response: Any) -> Dict[str, Any]:
@@ -53,9 +63,24 @@ def extract_metadata(response: Any) -> Dict[str, Any]:
 
 def is_authentication_error(error: Exception) -> bool:
     """Checks if the error is related to authentication/invalid API key."""
-    error_str = str(error).lower()
-    auth_indicators = ["authentication", "unauthorized", "invalid api key", "401"]
-    return any(indicator in error_str for indicator in auth_indicators)
+    from google.genai import errors as genai_errors
+    from openai import APIStatusError, AuthenticationError, PermissionDeniedError
+
+    # Typed errors carry the HTTP status, so the message is only scanned for
+    # errors that don't
+    if isinstance(error, (AuthenticationError, PermissionDeniedError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in AUTH_ERROR_STATUS_CODES
+    # Gemini reports an invalid key as a 400, so other client errors still
+    # fall through to the message check
+    if (
+        isinstance(error, genai_errors.ClientError)
+        and error.code in AUTH_ERROR_STATUS_CODES
+    ):
+        return True
+
+    return _AUTH_ERROR_RE.search(str(error)) is not None
 
 
 def extract_text_from_response(response: Any) -> str:
@@ -105,7 +130,10 @@ async def get_llm_context(
         raise ValueError(f"Unknown model provider for: {model_id}")
 
     try:
-        api_key = get_user_api_key(str(user_id), provider=provider)
+        # Secret Manager access is a blocking gRPC call, so keep it off the event loop
+        api_key = await asyncio.to_thread(
+            get_user_api_key, str(user_id), provider=provider
+        )
     except SecretNotFoundError:
         logging.error(f"{provider} API key not found for user {user_id}")
         raise InvalidAPIKeyError(
@@ -117,7 +145,7 @@ async def get_llm_context(
 
     base_url = get_base_url_for_provider(provider)
 
-    if provider == "gemini" and is_embedding:
+    if provider is Provider.GEMINI and is_embedding:
         client = get_gemini_client(api_key)
     else:
         client = get_openai_client(api_key, base_url=base_url)
@@ -1,42 +1,77 @@
 """Model to provider mapping utility."""
 
-from typing import Literal
+from enum import StrEnum
+from types import MappingProxyType
+from typing import Mapping
+
+__all__ = [
+    "Provider",
+    "MODEL_TO_PROVIDER_MAP",
+    "PROVIDER_TO_MODELS",
+    "get_provider_for_model",
+]
+
+
+class Provider(StrEnum):
+    """LLM providers; members compare and format as their plain string value."""
+
+    OPENAI = "openai"
+    GEMINI = "gemini"
+    ANTHROPIC = "anthropic"
+    XAI = "xai"
+    DEEPSEEK = "deepseek"
 
-Provider = Literal["openai", "gemini", "anthropic", "xai", "deepseek"]
 
 # Mapping from model ID to provider
 # This mapping should be kept in sync with the curatedModelCatalog in the Go backend
-MODEL_TO_PROVIDER_MAP: dict[str, Provider] = {
-    # OpenAI models
-    "gpt-5.2": "openai",
-    "gpt-5.1": "openai",
-    "gpt-5.1-chat-latest": "openai",
-    "gpt-5": "openai",
-    "gpt-5-chat-latest": "openai",
-    "gpt-5-mini": "openai",
-    "gpt-5-nano": "openai",
-    "gpt-4.1": "openai",
-    "gpt-4.1-mini": "openai",
-    "gpt-4.1-nano": "openai",
-    "gpt-4o": "openai",
-    "gpt-4o-mini": "openai",
-    # Gemini models
-    "gemini-3-flash-preview": "gemini",
-    "gemini-3-pro-preview": "gemini",
-    "gemini-2.5-pro": "gemini",
-    "gemini-2.5-flash": "gemini",
-    "gemini-2.5-flash-lite": "gemini",
-    "gemini-embedding-001": "gemini",
-    # Anthropic models
-    "claude-sonnet-4-5": "anthropic",
-    "claude-haiku-4-5": "anthropic",
-    # xAI models
-    "grok-4-1-fast-reasoning": "xai",
-    "grok-4-1-fast-non-reasoning": "xai",
-    # DeepSeek models
-    "deepseek-chat": "deepseek",
-    "deepseek-reasoner": "deepseek",
-}
+# Read-only so the shared table cannot be changed at runtime
+MODEL_TO_PROVIDER_MAP: Mapping[str, Provider] = MappingProxyType(
+    {
+        # OpenAI models
+        "gpt-5.2": Provider.OPENAI,
+        "gpt-5.1": Provider.OPENAI,
+        "gpt-5.1-chat-latest": Provider.OPENAI,
+        "gpt-5": Provider.OPENAI,
+        "gpt-5-chat-latest": Provider.OPENAI,
+        "gpt-5-mini": Provider.OPENAI,
+        "gpt-5-nano": Provider.OPENAI,
+        "gpt-4.1": Provider.OPENAI,
+        "gpt-4.1-mini": Provider.OPENAI,
+        "gpt-4.1-nano": Provider.OPENAI,
+        "gpt-4o": Provider.OPENAI,
+        "gpt-4o-mini": Provider.OPENAI,
+        # Gemini models
+        "gemini-3-flash-preview": Provider.GEMINI,
+        "gemini-3-pro-preview": Provider.GEMINI,
+        "gemini-2.5-pro": Provider.GEMINI,
+        "gemini-2.5-flash": Provider.GEMINI,
+        "gemini-2.5-flash-lite": Provider.GEMINI,
+        "gemini-embedding-001": Provider.GEMINI,
+        # Anthropic models
+        "claude-sonnet-4-5": Provider.ANTHROPIC,
+        "claude-haiku-4-5": Provider.ANTHROPIC,
+        # xAI models
+        "grok-4-1-fast-reasoning": Provider.XAI,
+        "grok-4-1-fast-non-reasoning": Provider.XAI,
+        # DeepSeek models
+        "deepseek-chat": Provider.DEEPSEEK,
+        "deepseek-reasoner": Provider.DEEPSEEK,
+    }
+)
+
+
+def _build_provider_to_models() -> Mapping[Provider, tuple[str, ...]]:
+    """Inverts MODEL_TO_PROVIDER_MAP, keeping each provider's models in order."""
+    provider_models: dict[Provider, list[str]] = {}
+    for model_id, provider in MODEL_TO_PROVIDER_MAP.items():
+        provider_models.setdefault(provider, []).append(model_id)
+    return MappingProxyType(
+        {provider: tuple(models) for provider, models in provider_models.items()}
+    )
+
+
+# Mapping from provider to its model IDs, built once at import
+PROVIDER_TO_MODELS = _build_provider_to_models()
 
 
 def get_provider_for_model(model_id: str) -> Provider | None:
@@ -3,21 +3,44 @@
 from __future__ import annotations
 
 import logging
+from functools import lru_cache
 from typing import Optional, TYPE_CHECKING, Any
 
-from app.utils.config import Settings
+from app.utils.config import get_settings
 from app.utils.model_provider_mapping import Provider
 
 if TYPE_CHECKING:
     from posthog import Posthog
     from google.genai import Client
 
+__all__ = [
+    "get_posthog_client",
+    "get_base_url_for_provider",
+    "get_openai_client",
+    "get_posthog_kwargs",
+    "get_gemini_client",
+    "shutdown_posthog",
+    "close_llm_http_client",
+]
+
 # Initialize settings
-settings = Settings()
+settings = get_settings()
 
 # Global Posthog client instance
 _posthog_client: Optional[Posthog] = None
 
+# HTTP client shared by every OpenAI-compatible client
+_llm_http_client: Optional[Any] = None
+
+# Max number of per-API-key LLM clients kept alive for connection reuse
+LLM_CLIENT_CACHE_SIZE = 256
+
+# HTTP connection pool shared by all LLM clients, and its connect timeout
+LLM_HTTP_MAX_CONNECTIONS = 200
+LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS = 50
+LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS = 30.0
+LLM_HTTP_CONNECT_TIMEOUT_SECONDS = 5.0
+
 
 def get_posthog_client() -> Optional[Posthog]:
     """Get or initialize the Posthog client."""
@@ -48,6 +71,18 @@ def get_posthog_client() -> Optional[Posthog]:
     return _posthog_client
 
 
+@lru_cache(maxsize=1)
+def _provider_base_urls() -> dict[Provider, str]:
+    """Builds the provider to base URL table once from settings."""
+    return {
+        Provider.OPENAI: settings.openai_api_base_url,
+        Provider.GEMINI: settings.gemini_api_base_url,
+        Provider.ANTHROPIC: settings.anthropic_api_base_url,
+        Provider.XAI: settings.xai_api_base_url,
+        Provider.DEEPSEEK: settings.deepseek_api_base_url,
+    }
+
+
 def get_base_url_for_provider(provider: Provider) -> str:
     """
     Get the base URL for a given provider.
@@ -58,19 +93,43 @@ def get_base_url_for_provider(provider: Provider) -> str:
     Returns:
         The base URL for the provider
     """
-    provider_base_urls: dict[Provider, str] = {
-        "openai": settings.openai_api_base_url,
-        "gemini": settings.gemini_api_base_url,
-        "anthropic": settings.anthropic_api_base_url,
-        "xai": settings.xai_api_base_url,
-        "deepseek": settings.deepseek_api_base_url,
-    }
-    return provider_base_urls.get(provider, settings.openai_api_base_url)
+    return _provider_base_urls().get(provider, settings.openai_api_base_url)
+
+
+def _get_llm_http_client() -> Any:
+    """
+    Get or initialize the HTTP client shared by all OpenAI-compatible clients.
+    Keeps the SDK defaults but with explicit pool limits and a short connect
+    timeout, so connections to a provider are reused across API keys.
+    """
+    global _llm_http_client
+
+    if _llm_http_client is None:
+        import httpx
+        from openai import DefaultAsyncHttpxClient
+
+        _llm_http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(
+                settings.llm_timeout_seconds,
+                connect=LLM_HTTP_CONNECT_TIMEOUT_SECONDS,
+            ),
+        )
+
+    return _llm_http_client
 
 
+@lru_cache(maxsize=LLM_CLIENT_CACHE_SIZE)
 def get_openai_client(api_key: str, base_url: str | None = None) -> Any:
     """
     Get an OpenAI client. Wraps with Posthog for automatic LLM analytics if enabled.
+    Clients are cached per (api_key, base_url) and share one HTTP connection pool.
+    Every request is bounded by settings.llm_timeout_seconds (with a short
+    connect timeout) and retried at most settings.llm_max_retries times.
 
     Args:
         api_key: API key for the provider
@@ -90,6 +149,8 @@ def get_openai_client(api_key: str, base_url: str | None = None) -> Any:
         return AsyncOpenAI(
             api_key=api_key,
             base_url=base_url,
+            max_retries=settings.llm_max_retries,
+            http_client=_get_llm_http_client(),
         )
 
     from posthog.ai.openai import AsyncOpenAI
@@ -97,6 +158,8 @@ def get_openai_client(api_key: str, base_url: str | None = None) -> Any:
     return AsyncOpenAI(
         api_key=api_key,
         base_url=base_url,
+        max_retries=settings.llm_max_retries,
+        http_client=_get_llm_http_client(),
         posthog_client=posthog_client,  # Optional: if None, Posthog will use default client
     )
 
@@ -119,9 +182,10 @@ def get_posthog_kwargs(
     }
 
 
+@lru_cache(maxsize=LLM_CLIENT_CACHE_SIZE)
 def get_gemini_client(api_key: str) -> "Client":
     """
-    Get a Gemini client.
+    Get a Gemini client, cached per API key.
 
     Args:
         api_key: API key for the provider
@@ -141,3 +205,16 @@ def shutdown_posthog() -> None:
             logging.error(f"Error shutting down Posthog client: {e}")
         finally:
             _posthog_client = None
+
+
+async def close_llm_http_client() -> None:
+    """Close the shared LLM HTTP client and drop the clients that use it."""
+    global _llm_http_client
+    if _llm_http_client:
+        try:
+            await _llm_http_client.aclose()
+        except Exception as e:
+            logging.error(f"Error closing LLM HTTP client: {e}")
+        finally:
+            _llm_http_client = None
+            get_openai_client.cache_clear()
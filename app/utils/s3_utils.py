@@ -1,27 +1,43 @@
 import logging
 import base64
+from functools import lru_cache
+
 import boto3
-from app.utils.config import Settings
+from botocore.config import Config
+from app.utils.config import get_settings
+
+settings = get_settings()
 
-settings = Settings()
+# Max concurrent HTTP connections kept by the shared S3 client
+S3_MAX_POOL_CONNECTIONS = 50
 
 
+@lru_cache(maxsize=1)
 def get_s3_client():
-    """Initializes and returns an S3 client."""
+    """
+    Returns the process-wide S3 client, created on first use.
+    boto3 clients are thread-safe, so callers share it (and its connection pool)
+    and must not close it.
+    """
     return boto3.client(
         "s3",
         aws_access_key_id=settings.s3_access_key or None,
         aws_secret_access_key=settings.s3_secret_key or None,
         endpoint_url=settings.s3_endpoint_url or None,
+        config=Config(
+            max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+            retries={"mode": "standard"},
+        ),
     )
 
 
-def download_image_as_base64(s3_client, bucket, key):
-    """Downloads an image from S3 and returns it as a base64 string."""
+def download_image_as_data_url(s3_client, bucket, key, mime_type="image/png"):
+    """Downloads an image from S3 and returns it as a base64 data URL."""
     try:
         response = s3_client.get_object(Bucket=bucket, Key=key)
         image_data = response["Body"].read()
-        return base64.b64encode(image_data).decode("utf-8")
     except Exception as e:
         logging.error(f"Failed to download image from S3 (Key: {key}): {e}")
         return None
+    base64_image = base64.b64encode(image_data).decode("utf-8")
+    return f"data:{mime_type};base64,{base64_image}"
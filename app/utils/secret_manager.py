@@ -3,9 +3,9 @@ import logging
 import functools
 from google.cloud import secretmanager
 from google.api_core import exceptions
-from app.utils.config import Settings
+from app.utils.config import get_settings
 
-settings = Settings()
+settings = get_settings()
 
 logger = logging.getLogger(__name__)
 